@@ -14,23 +14,165 @@ Extraction Strategies (in order):
 Based on the original productExtraction.py but optimized for pre-rendered HTML.
 """
 
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+import soupsieve
 from typing import List, Dict, Any, Optional, Tuple
 import re
 import json
-from urllib.parse import urljoin, urlparse
+import time
+from urllib.parse import urljoin, urlparse, urlsplit
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 import logging
 
+# lxml's C tokenizer is far faster than the pure-Python html.parser; fall back
+# to the stdlib parser if lxml isn't installed
+try:
+    import lxml  # noqa: F401
+    SOUP_PARSER = 'lxml'
+except ImportError:
+    SOUP_PARSER = 'html.parser'
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads_json(text: str) -> Any:
+    """
+    Decode embedded JSON with orjson when available.
+    
+    orjson is stricter than the stdlib (it rejects NaN/Infinity and lone
+    surrogates), so anything it rejects gets a second try with json.loads
+    and decoding never fails where it used to succeed.
+    """
+    if orjson is not None:
+        try:
+            # orjson only takes exact str; bs4 hands out NavigableString
+            return orjson.loads(str(text) if isinstance(text, str) else text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+# Absolute http(s) URLs that urljoin would hand back unchanged: non-empty ASCII host,
+# no whitespace/control characters or IPv6 brackets, and no empty ';', '?' or '#'
+# component (urljoin's reassembly drops those)
+_PLAIN_ABSOLUTE_URL_RE = re.compile(r"https?://[A-Za-z0-9.\-_~%!$&'()*+,=:@]+(?:[/?#][^\s\[\]]*)?")
+
+
+def _resolve(base_url: str, url: Any) -> str:
+    """urljoin(base_url, url), skipping the parse/reassemble for absolute and protocol-relative URLs."""
+    if type(url) is str:
+        if url.startswith('//'):
+            # Protocol-relative (common for CDN images): urljoin just adds the
+            # page's scheme, so check the absolute form instead
+            scheme = urlsplit(base_url).scheme
+            if scheme in ('http', 'https'):
+                url = scheme + ':' + url
+        if (_PLAIN_ABSOLUTE_URL_RE.fullmatch(url)
+                and url[-1] not in '?#;' and '?#' not in url and ';?' not in url and ';#' not in url):
+            return url
+    return urljoin(base_url, url)
+
 
 class HTMLProductParser:
     """Parses HTML content to extract product information using multiple strategies."""
     
+    # Patterns applied per page/card, compiled once for every instance
+    _ERROR_PAGE_RE = re.compile('|'.join(map(re.escape, [
+        '403 error', '404 error', 'access denied', 'request blocked',
+        'error: the request could not be satisfied', 'cloudfront',
+        'page not found', 'not found', 'forbidden'
+    ])))
+    _BG_IMAGE_RE = re.compile(r'background-image:\s*url\(["\']?([^"\']+)["\']?\)')
+    _SRCSET_URL_RE = re.compile(r'([^\s,]+)(?:\s+\d+[wx])?')
+    _PRICE_NUMBER_RE = re.compile(r'[\d,]+\.?\d*')
+    _RATING_RE = re.compile(r'(\d+\.?\d*)\s*(?:out of|\/|\|)?')
+    _DIGITS_RE = re.compile(r'\d+')
+    # Class names and itemtype URLs are ASCII, so skip Unicode case folding
+    _PRICE_CLASS_RE = re.compile(r'price', re.I | re.A)
+    _PRICE_CLASS_WIDE_RE = re.compile(r'price|cost|amount|rs\.?|₹', re.I | re.A)
+    _PRODUCT_ITEMTYPE_RE = re.compile(r'Product', re.I | re.A)
+    # Substrings that mark an image URL as page chrome, and ones that suggest a product shot
+    _SKIP_IMAGE_RE = re.compile('|'.join(map(re.escape, [
+        'logo', 'icon', 'favicon', 'sprite', 'placeholder',
+        'banner', 'header', 'footer', 'nav', 'menu',
+        '.svg', '.ico', 'data:image', 'base64',
+        'chevron', 'arrow', 'close', 'search', 'cart',
+    ])))
+    _PRODUCT_IMAGE_KEYWORD_RE = re.compile('product|item|image|photo|picture|thumb')
+    _VALID_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+    # Link paths that are never product pages, and file types that aren't pages at all
+    _SKIP_LINK_PATHS = ('/login', '/cart', '/checkout', '/account', '/help', '/contact', '/about', '/terms', '/privacy')
+    _NON_PAGE_EXTENSIONS = ('.jpg', '.png', '.gif', '.css', '.js', '.svg', '.ico')
+    # Common field mappings for generic product dicts from inline scripts
+    _DICT_TITLE_KEYS = ('name', 'title', 'productName', 'product_name')
+    _DICT_URL_KEYS = ('url', 'link', 'productUrl', 'product_url')
+    _DICT_IMAGE_KEYS = ('image', 'imageUrl', 'img', 'thumbnail')
+    _DICT_PRICE_KEYS = ('price', 'cost', 'amount')
+    # Navigation text that rules out a title (exact match) or a card (substring)
+    _NAV_TITLES = frozenset(['home', 'about', 'contact', 'cart', 'login', 'search'])
+    _NAV_TEXT_RE = re.compile('home|menu|login|cart|search|account')
+    _GENERIC_LINK_TITLE_RE = re.compile('|'.join(map(re.escape, [
+        'click here', 'more', 'view', 'link', 'image', 'logo', 'home', 'menu', 'search',
+        'cart', 'account', 'login', 'sign in', 'sign up', 'jiomart.com', 'jiomart',
+    ])))
+    # JavaScript state/array patterns for inline scripts
+    _JS_STATE_PATTERNS = tuple(re.compile(pattern, re.DOTALL) for pattern in [
+        # React/Next.js state patterns (non-greedy to avoid matching too much)
+        r'window\.__INITIAL_STATE__\s*=\s*(\{.*?"products".*?\})',
+        r'window\.__PRELOADED_STATE__\s*=\s*(\{.*?"products".*?\})',
+        r'__NEXT_DATA__\s*=\s*(\{.*?"products".*?\})',
+        # Product arrays - be more aggressive
+        r'"products"\s*:\s*(\[[^\]]+\])',
+        r'"items"\s*:\s*(\[[^\]]+\])',
+        r'"data"\s*:\s*(\[[^\]]+\])',
+        r'"results"\s*:\s*(\[[^\]]+\])',
+        # Meesho and other platforms might use different keys
+        r'"catalog"\s*:\s*(\[[^\]]+\])',
+        r'"list"\s*:\s*(\[[^\]]+\])',
+    ])
+    # Everything up to the next bracket outside a double-quoted string (possessive,
+    # so a long or unterminated string can't make it backtrack)
+    _JSON_SKIP_TO_BRACKET_RE = re.compile(r'(?:[^"\[\]]++|"(?:[^"\\]++|\\.)*+")*+', re.DOTALL)
+    # Flat {...} objects in inline scripts and the keys that make one worth parsing
+    _FLAT_OBJECT_RE = re.compile(r'\{[^{}]*\}')
+    _SIMPLE_OBJECT_KEY_RES = (
+        re.compile(r'"product"', re.I),
+        re.compile(r'"name".*"url"', re.I | re.DOTALL),
+        re.compile(r'"title".*"link"', re.I | re.DOTALL),
+    )
+    _JS_ARRAY_KEY_RE = re.compile(r'("products"|"items"|"data"|"results"|"catalog"|"list")\s*:\s*(\[)', re.I)
+    
+    # Memoized _is_product_url / _is_blacklisted results kept per parser
+    _URL_CHECK_CACHE_SIZE = 4096
+    
+    # Image URL attributes in order of preference, flagged when they hold a srcset list
+    _IMAGE_URL_ATTRS = (
+        ('src', False),
+        ('data-src', False),
+        ('data-lazy-src', False),
+        ('data-original', False),
+        ('data-image', False),
+        ('data-lazy', False),
+        ('data-srcset', True),
+        ('srcset', True),
+    )
+    
     def __init__(self):
         """Initialize parser with selector sets and blacklist patterns."""
         self.logger = logging.getLogger(__name__)
         self._build_selector_sets()
         self._build_blacklist()
+        # First valid image URL (or '') under each ancestor checked by
+        # _extract_image_from_element, keyed by id(tag); reset for every page
+        self._ancestor_image_cache: Dict[int, str] = {}
+        # (soup, {'scripts': [...], 'links': [...], ...}) built by _page_nodes for the
+        # page being parsed; cleared once its strategies have run
+        self._page_node_cache: Optional[Tuple[BeautifulSoup, Dict[str, List[Tag]]]] = None
         
     def _build_selector_sets(self):
         """Build comprehensive CSS selector library for product extraction."""
@@ -75,8 +217,8 @@ class HTMLProductParser:
                 '[itemtype*="Product"]',
                 '[class*="item"]',
                 '[class*="listing"]',
-                'li[class*="product"]',
-                'div[class*="product"]',
+                # No li/div[class*="product"] here: '[class*="product"]' above already
+                # matches every such element, so they could never be reached
             ],
             
             # Titles
@@ -152,6 +294,19 @@ class HTMLProductParser:
             ],
         }
         
+        # Compile every selector once; Tag.select()/select_one() would re-resolve
+        # the selector string for each card
+        self.compiled_selectors = {
+            group: [soupsieve.compile(selector) for selector in selectors]
+            for group, selectors in self.selector_sets.items()
+        }
+        # Container selectors that also appear among the card selectors match each
+        # card individually rather than a list wrapper (see _extract_from_dom)
+        self._card_level_containers = frozenset(self.selector_sets['result_containers']) & frozenset(self.selector_sets['product_cards'])
+        self._brand_selector = soupsieve.compile('[itemprop="brand"], [class*="brand"], [data-brand]')
+        self._sku_selector = soupsieve.compile('[itemprop="sku"], [data-sku], [data-product-id]')
+        self._stock_selector = soupsieve.compile('[itemprop="availability"], [class*="stock"], [data-stock]')
+        
     def _build_blacklist(self):
         """Build URL blacklist patterns to avoid non-product pages."""
         self.blacklist_keywords = [
@@ -160,6 +315,8 @@ class HTMLProductParser:
             'terms', 'privacy', 'policy', 'blog', 'news',
             'category', 'brand', 'deals', 'offer', 'sale',
         ]
+        # Single-pass matcher over the lowercased URL for all keywords
+        self._blacklist_re = re.compile('|'.join(map(re.escape, self.blacklist_keywords)))
         
         self.product_url_patterns = [
             r'/product[/-]',
@@ -175,6 +332,17 @@ class HTMLProductParser:
             r'productId=',  # Snapdeal pattern
             r'/product/',  # Generic product path
         ]
+        # One case-insensitive alternation instead of a search per pattern
+        self._product_url_re = re.compile('|'.join(self.product_url_patterns), re.I)
+        
+        # Both URL checks are pure functions of the URL, and the link strategies and
+        # _validate_product test the same URLs over and over, so memoize them per parser
+        product_url_search = self._product_url_re.search
+        blacklist_search = self._blacklist_re.search
+        self._product_url_check = lru_cache(maxsize=self._URL_CHECK_CACHE_SIZE)(
+            lambda url: product_url_search(url) is not None)
+        self._blacklist_check = lru_cache(maxsize=self._URL_CHECK_CACHE_SIZE)(
+            lambda url: blacklist_search(url.lower()) is not None)
     
     def parse_html(self, html_content: str, source_url: str, max_items: int = 100) -> Dict[str, Any]:
         """
@@ -188,17 +356,14 @@ class HTMLProductParser:
         Returns:
             Dict with success status, products list, and metadata
         """
-        start_time = datetime.now()
+        start_time = time.perf_counter()
+        self._ancestor_image_cache = {}
+        self._page_node_cache = None
         
         try:
             # Check for error pages (403, 404, etc.)
-            html_lower = html_content.lower()
-            error_indicators = [
-                '403 error', '404 error', 'access denied', 'request blocked',
-                'error: the request could not be satisfied', 'cloudfront',
-                'page not found', 'not found', 'forbidden'
-            ]
-            if any(indicator in html_lower for indicator in error_indicators) and len(html_content) < 5000:
+            # Only short pages can be error pages, so don't lowercase (copy) large ones
+            if len(html_content) < 5000 and self._ERROR_PAGE_RE.search(html_content.lower()):
                 # Likely an error page
                 return {
                     'success': False,
@@ -208,7 +373,7 @@ class HTMLProductParser:
                     'num_products': 0
                 }
             
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, SOUP_PARSER)
             platform = self._extract_platform(source_url)
             
             # Try extraction strategies in order
@@ -224,11 +389,18 @@ class HTMLProductParser:
                 ('fallback', self._extract_from_links_with_images),
             ]
             
+            # Every strategy needs at least one tag (cards, links, scripts, itemtype),
+            # so a document with no markup at all (plain-text block notices, JSON
+            # error bodies) can skip straight to the no-products result
+            if '<' not in html_content:
+                self.logger.debug("No markup in page from %s, skipping strategies", source_url)
+                strategies = []
+            
             best_products = []
             best_strategy = None
             
             for strategy_name, strategy_func in strategies:
-                self.logger.info(f"Trying strategy: {strategy_name}")
+                self.logger.debug("Trying strategy: %s", strategy_name)
                 try:
                     found_products = strategy_func(soup, source_url, max_items)
                 
@@ -237,15 +409,15 @@ class HTMLProductParser:
                         if len(found_products) >= 3:
                             strategy_used = strategy_name
                             products = found_products
-                            self.logger.info(f"[OK] Strategy '{strategy_name}' succeeded with {len(found_products)} products")
+                            self.logger.debug("[OK] Strategy '%s' succeeded with %d products", strategy_name, len(found_products))
                             break
                         # Otherwise, keep track of the best result so far (accept any products found)
                         elif len(found_products) > len(best_products):
                             best_products = found_products
                             best_strategy = strategy_name
-                            self.logger.info(f"Strategy '{strategy_name}' found {len(found_products)} products (keeping as candidate)")
+                            self.logger.debug("Strategy '%s' found %d products (keeping as candidate)", strategy_name, len(found_products))
                     else:
-                        self.logger.info(f"Strategy '{strategy_name}' found no products")
+                        self.logger.debug("Strategy '%s' found no products", strategy_name)
                 except (AttributeError, TypeError, ValueError) as e:
                     # Catch errors like 'int' object has no attribute 'get'
                     self.logger.warning(f"Strategy '{strategy_name}' failed with error: {type(e).__name__}: {e}")
@@ -255,18 +427,21 @@ class HTMLProductParser:
                     self.logger.warning(f"Strategy '{strategy_name}' failed with unexpected error: {type(e).__name__}: {e}")
                     continue
             
+            # Don't keep this page's tree alive through the shared node lists
+            self._page_node_cache = None
+            
             # Use the best strategy found (even if < 3 products)
             if best_products and not strategy_used:
                 strategy_used = best_strategy
                 products = best_products
-                self.logger.info(f"Using strategy '{strategy_used}' with {len(products)} products")
+                self.logger.debug("Using strategy '%s' with %d products", strategy_used, len(products))
             elif not products:
                 products = []
             
             # Deduplicate
             products = self._dedupe_by_url(products)
             
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             
             result = {
                 'success': len(products) > 0,
@@ -313,9 +488,14 @@ class HTMLProductParser:
         
         # Find result containers
         containers = []
-        for selector in self.selector_sets['result_containers']:
-            found = soup.select(selector)
+        for selector_text, selector in zip(self.selector_sets['result_containers'], self.compiled_selectors['result_containers']):
+            found = selector.select(soup)
             if found:
+                if selector_text in self._card_level_containers:
+                    # These matches are the product cards themselves (e.g. Amazon's
+                    # s-search-result); searching inside each one for cards would
+                    # only find fragments of the first product
+                    return self._extract_from_cards(found, base_url, max_items)
                 containers.extend(found)
                 break
         
@@ -327,16 +507,21 @@ class HTMLProductParser:
         for container in containers:
             # Find product cards
             cards = []
-            for selector in self.selector_sets['product_cards']:
-                found = container.select(selector)
+            for selector in self.compiled_selectors['product_cards']:
+                found = selector.select(container)
                 if found and len(found) >= 1:  # Accept even single products
                     cards = found
                     break
             
             # If still no cards, try more aggressive search
             if not cards:
-                # Look for any div/li with an image and a link
-                potential_cards = container.find_all(['div', 'li', 'article'])
+                # Look for any div/li with an image and a link. Walk the tree lazily:
+                # the scan usually stops at max_items * 2 candidates, so building the
+                # full find_all() list of every div/li on the page is wasted work
+                potential_cards = (
+                    elem for elem in container.descendants
+                    if type(elem) is Tag and elem.name in ('div', 'li', 'article')
+                )
                 for card in potential_cards:
                     has_img = card.find('img')
                     has_link = card.find('a', href=True)
@@ -348,50 +533,54 @@ class HTMLProductParser:
                             if len(cards) >= max_items * 2:  # Get more candidates
                                 break
             
-            # Extract fields from each card
-            for card in cards[:max_items]:
-                product = self._extract_fields_from_card(card, base_url)
-                if product and self._validate_product(product):
-                    products.append(product)
-                    if len(products) >= max_items:
-                        break
-            
+            products = self._extract_from_cards(cards, base_url, max_items)
             if products:
                 break
         
         return products
     
+    def _extract_from_cards(self, cards: List[Tag], base_url: str, max_items: int) -> List[Dict]:
+        """Extract and validate products from candidate card elements."""
+        products = []
+        for card in cards[:max_items]:
+            product = self._extract_fields_from_card(card, base_url)
+            if product and self._validate_product(product):
+                products.append(product)
+                if len(products) >= max_items:
+                    break
+        return products
+    
     def _extract_fields_from_card(self, card: Tag, base_url: str) -> Optional[Dict]:
         """Extract all fields from a product card."""
         product = {}
         
         # Title
-        for selector in self.selector_sets['titles']:
-            elem = card.select_one(selector)
+        for selector in self.compiled_selectors['titles']:
+            elem = selector.select_one(card)
             if elem:
                 product['title'] = self._clean_text(elem.get('title') or elem.get_text())
                 break
         
         # Product URL
-        for selector in self.selector_sets['links']:
-            elem = card.select_one(selector)
+        for selector in self.compiled_selectors['links']:
+            elem = selector.select_one(card)
             if elem and elem.get('href'):
                 url = elem.get('href')
-                product['product_url'] = urljoin(base_url, url)
+                product['product_url'] = _resolve(base_url, url)
                 break
         
         # If no product URL found, try any link
         if 'product_url' not in product:
             link = card.find('a', href=True)
             if link:
-                product['product_url'] = urljoin(base_url, link['href'])
+                product['product_url'] = _resolve(base_url, link['href'])
         
         # Image - comprehensive extraction
         product['image_url'] = self._extract_image_from_element(card, base_url)
         
         # Price
-        for selector in self.selector_sets['prices']:
-            elem = card.select_one(selector)
+        for selector in self.compiled_selectors['prices']:
+            elem = selector.select_one(card)
             if elem:
                 price_text = elem.get('content') or elem.get_text()
                 price, currency = self._parse_price(price_text)
@@ -402,8 +591,8 @@ class HTMLProductParser:
                     break
         
         # Rating
-        for selector in self.selector_sets['ratings']:
-            elem = card.select_one(selector)
+        for selector in self.compiled_selectors['ratings']:
+            elem = selector.select_one(card)
             if elem:
                 rating_text = elem.get('content') or elem.get('aria-label') or elem.get_text()
                 rating = self._parse_rating(rating_text)
@@ -412,8 +601,8 @@ class HTMLProductParser:
                     break
         
         # Review count
-        for selector in self.selector_sets['reviews']:
-            elem = card.select_one(selector)
+        for selector in self.compiled_selectors['reviews']:
+            elem = selector.select_one(card)
             if elem:
                 review_text = elem.get('content') or elem.get_text()
                 count = self._parse_review_count(review_text)
@@ -422,17 +611,17 @@ class HTMLProductParser:
                     break
         
         # Brand (if available)
-        brand_elem = card.select_one('[itemprop="brand"], [class*="brand"], [data-brand]')
+        brand_elem = self._brand_selector.select_one(card)
         if brand_elem:
             product['brand'] = self._clean_text(brand_elem.get('content') or brand_elem.get_text())
         
         # SKU (if available)
-        sku_elem = card.select_one('[itemprop="sku"], [data-sku], [data-product-id]')
+        sku_elem = self._sku_selector.select_one(card)
         if sku_elem:
             product['sku'] = self._clean_text(sku_elem.get('content') or sku_elem.get_text())
         
         # In stock
-        stock_elem = card.select_one('[itemprop="availability"], [class*="stock"], [data-stock]')
+        stock_elem = self._stock_selector.select_one(card)
         if stock_elem:
             stock_text = (stock_elem.get('content') or stock_elem.get_text()).lower()
             product['in_stock'] = 'instock' in stock_text or 'available' in stock_text
@@ -445,13 +634,13 @@ class HTMLProductParser:
         """Extract products from JSON-LD structured data (Strategy 2)."""
         products = []
         
-        scripts = soup.find_all('script', type='application/ld+json')
+        scripts = [s for s in self._page_nodes(soup)['scripts'] if s.get('type') == 'application/ld+json']
         
         for script in scripts:
             try:
                 if not script.string:
                     continue
-                data = json.loads(script.string)
+                data = loads_json(script.string)
                 found_products = self._find_products_in_jsonld(data, base_url)
                 products.extend(found_products)
                 
@@ -469,79 +658,94 @@ class HTMLProductParser:
         return products[:max_items]
     
     def _find_products_in_jsonld(self, data: Any, base_url: str) -> List[Dict]:
-        """Recursively find Product objects in JSON-LD data."""
+        """
+        Find Product objects anywhere in JSON-LD data.
+        
+        Walks the tree with an explicit stack (deep ItemLists can't hit the
+        recursion limit) in the same order as a depth-first recursive walk.
+        If parsing a product fails, the rest of that node is skipped and the
+        walk carries on with its siblings.
+        """
         products = []
         
-        try:
-            # Skip non-dict, non-list types (strings, ints, etc.)
-            if not isinstance(data, (dict, list)):
-                return products
-        except Exception:
-            # If isinstance fails for some reason, return empty
+        # Skip non-dict, non-list types (strings, ints, etc.)
+        if not isinstance(data, (dict, list)):
             return products
         
-        try:
-            if isinstance(data, dict):
-                # Handle ItemList (e.g., Myntra uses this)
-                if data.get('@type') == 'ItemList' and 'itemListElement' in data:
-                    items = data.get('itemListElement', [])
-                    if isinstance(items, list):
-                        for item in items:
-                            # Skip non-dict items (position numbers, etc.)
-                            if not isinstance(item, dict):
-                                continue
-                            
-                            # ItemList items can have 'item' property containing the product
-                            item_value = item.get('item')
-                            # Use item_value if it's a dict, otherwise use item itself
-                            product_data = item_value if isinstance(item_value, dict) else (item if isinstance(item, dict) else None)
-                            
-                            if isinstance(product_data, dict):
-                                # Check if it's a Product or has product-like data
-                                if product_data.get('@type') == 'Product' or 'name' in product_data or 'url' in product_data:
-                                    product = self._parse_jsonld_product(product_data, base_url)
-                                    if product:
-                                        products.append(product)
-                            
-                            # Also check if item itself has product data (only if we haven't already processed it)
-                            if isinstance(item, dict) and product_data != item:
-                                if item.get('@type') == 'Product' or ('name' in item and 'url' in item):
-                                    product = self._parse_jsonld_product(item, base_url)
-                                    if product:
-                                        products.append(product)
-                            # Recurse into the item to find nested products
-                            products.extend(self._find_products_in_jsonld(item, base_url))
-                
-                # Handle direct Product objects
-                if data.get('@type') == 'Product' or 'Product' in str(data.get('@type', '')):
-                    product = self._parse_jsonld_product(data, base_url)
-                    if product:
-                        products.append(product)
-                
-                # Recurse into nested objects (skip non-dict, non-list values)
-                try:
-                    for value in data.values():
-                        if isinstance(value, (dict, list)):
-                            products.extend(self._find_products_in_jsonld(value, base_url))
-                except (AttributeError, TypeError):
-                    # data.values() might fail if data is not actually a dict
-                    pass
+        # One work-item generator per node being visited
+        stack = [self._jsonld_work_items(data)]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
             
-            elif isinstance(data, list):
-                try:
-                    for item in data:
-                        if isinstance(item, (dict, list)):
-                            products.extend(self._find_products_in_jsonld(item, base_url))
-                except (TypeError, AttributeError):
-                    # Iteration might fail
-                    pass
-        except (AttributeError, TypeError, ValueError) as e:
-            # Catch any unexpected errors like 'int' object has no attribute 'get'
-            self.logger.debug(f"Error in _find_products_in_jsonld: {type(e).__name__}: {e}")
-            return products
+            action, node = item
+            if action == 'visit':
+                stack.append(self._jsonld_work_items(node))
+                continue
+            
+            try:
+                product = self._parse_jsonld_product(node, base_url)
+            except (AttributeError, TypeError, ValueError) as e:
+                # Catch any unexpected errors like 'int' object has no attribute 'get'
+                self.logger.debug("Error in _find_products_in_jsonld: %s: %s", type(e).__name__, e)
+                stack.pop()
+                continue
+            if product:
+                products.append(product)
         
         return products
     
+    def _jsonld_work_items(self, data: Any):
+        """Yield ('parse', product_data) and ('visit', child) steps for one JSON-LD node, in order."""
+        if isinstance(data, dict):
+            node_type = data.get('@type')
+            
+            # Handle ItemList (e.g., Myntra uses this)
+            if node_type == 'ItemList' and 'itemListElement' in data:
+                items = data.get('itemListElement', [])
+                if isinstance(items, list):
+                    for item in items:
+                        # Skip non-dict items (position numbers, etc.)
+                        if not isinstance(item, dict):
+                            continue
+                        
+                        # ItemList items can have 'item' property containing the product
+                        item_value = item.get('item')
+                        # Use item_value if it's a dict, otherwise use item itself
+                        product_data = item_value if isinstance(item_value, dict) else item
+                        
+                        # Check if it's a Product or has product-like data
+                        if product_data.get('@type') == 'Product' or 'name' in product_data or 'url' in product_data:
+                            yield 'parse', product_data
+                        
+                        # Also check if item itself has product data (only if we haven't already processed it)
+                        if product_data != item:
+                            if item.get('@type') == 'Product' or ('name' in item and 'url' in item):
+                                yield 'parse', item
+                        # Descend into the item to find nested products
+                        yield 'visit', item
+            
+            # Handle direct Product objects; @type is normally a plain string, while
+            # multi-type values (lists) keep the original substring-of-repr check
+            if type(node_type) is str:
+                is_product = 'Product' in node_type
+            else:
+                is_product = node_type is not None and 'Product' in str(node_type)
+            if is_product:
+                yield 'parse', data
+            
+            # Descend into nested objects (skip non-dict, non-list values)
+            for value in data.values():
+                if isinstance(value, (dict, list)):
+                    yield 'visit', value
+        
+        elif isinstance(data, list):
+            for item in data:
+                if isinstance(item, (dict, list)):
+                    yield 'visit', item
+    
     def _parse_jsonld_product(self, data: Dict, base_url: str) -> Optional[Dict]:
         """Parse a single Product object from JSON-LD."""
         # Ensure data is a dict
@@ -556,7 +760,7 @@ class HTMLProductParser:
         # URL
         url = data.get('url', '')
         if url:
-            product['product_url'] = urljoin(base_url, url)
+            product['product_url'] = _resolve(base_url, url)
         
         # Image - comprehensive extraction
         image = data.get('image', '')
@@ -585,7 +789,7 @@ class HTMLProductParser:
             image = str(image) if image else ''
         
         if image and isinstance(image, str) and self._is_valid_product_image(image):
-            product['image_url'] = urljoin(base_url, image)
+            product['image_url'] = _resolve(base_url, image)
         
         # Price
         offers = data.get('offers', {})
@@ -653,30 +857,39 @@ class HTMLProductParser:
             return ''
         
         # First, try direct image selectors
-        for selector in self.selector_sets['images']:
-            img_elem = element.select_one(selector)
+        for selector in self.compiled_selectors['images']:
+            img_elem = selector.select_one(element)
             if img_elem:
                 img_url = self._get_image_url_from_element(img_elem)
                 if img_url:
-                    return urljoin(base_url, img_url)
+                    return _resolve(base_url, img_url)
         
         # Try to find any img tag in the element
         img_tags = element.find_all('img', limit=5)
         for img in img_tags:
             img_url = self._get_image_url_from_element(img)
             if img_url and self._is_valid_product_image(img_url):
-                return urljoin(base_url, img_url)
+                return _resolve(base_url, img_url)
         
-        # Check parent elements for images
+        # Check parent elements for images (cards in one grid share ancestors, so
+        # each ancestor is only searched once per page)
+        ancestor_images = self._ancestor_image_cache
         parent = element.parent
         for _ in range(3):  # Check up to 3 levels up
             if not parent:
                 break
-            img_tags = parent.find_all('img', limit=3)
-            for img in img_tags:
-                img_url = self._get_image_url_from_element(img)
-                if img_url and self._is_valid_product_image(img_url):
-                    return urljoin(base_url, img_url)
+            parent_key = id(parent)
+            img_url = ancestor_images.get(parent_key)
+            if img_url is None:
+                img_url = ''
+                for img in parent.find_all('img', limit=3):
+                    candidate = self._get_image_url_from_element(img)
+                    if candidate and self._is_valid_product_image(candidate):
+                        img_url = candidate
+                        break
+                ancestor_images[parent_key] = img_url
+            if img_url:
+                return _resolve(base_url, img_url)
             parent = parent.parent
         
         # Check siblings for images
@@ -688,16 +901,16 @@ class HTMLProductParser:
                 for img in img_tags:
                     img_url = self._get_image_url_from_element(img)
                     if img_url and self._is_valid_product_image(img_url):
-                        return urljoin(base_url, img_url)
+                        return _resolve(base_url, img_url)
         
         # Try background image from style attribute
         style = element.get('style', '')
         if style:
-            bg_match = re.search(r'background-image:\s*url\(["\']?([^"\']+)["\']?\)', style)
+            bg_match = self._BG_IMAGE_RE.search(style)
             if bg_match:
                 img_url = bg_match.group(1)
                 if self._is_valid_product_image(img_url):
-                    return urljoin(base_url, img_url)
+                    return _resolve(base_url, img_url)
         
         return ''
     
@@ -706,27 +919,18 @@ class HTMLProductParser:
         if not img_elem:
             return ''
         
-        # Check various image attributes in order of preference
-        attrs_to_check = [
-            'src',
-            'data-src',
-            'data-lazy-src',
-            'data-original',
-            'data-image',
-            'data-lazy',
-            'data-srcset',
-            'srcset',
-        ]
-        
-        for attr in attrs_to_check:
-            value = img_elem.get(attr, '')
+        # Check various image attributes in order of preference, straight from the
+        # attrs dict (Tag.get() is a wrapper around the same lookup)
+        attrs = img_elem.attrs
+        for attr, is_srcset in self._IMAGE_URL_ATTRS:
+            value = attrs.get(attr)
             if value:
                 # Handle srcset (format: "url1 1x, url2 2x" or "url1 100w, url2 200w")
-                if attr in ('srcset', 'data-srcset'):
+                if is_srcset:
                     # Extract first URL from srcset
-                    urls = re.findall(r'([^\s,]+)(?:\s+\d+[wx])?', value)
-                    if urls:
-                        return urls[0].strip()
+                    first_url = self._SRCSET_URL_RE.search(value)
+                    if first_url:
+                        return first_url.group(1).strip()
                 else:
                     return value.strip()
         
@@ -740,28 +944,18 @@ class HTMLProductParser:
         img_url_lower = img_url.lower()
         
         # Skip common non-product images
-        skip_patterns = [
-            'logo', 'icon', 'favicon', 'sprite', 'placeholder',
-            'banner', 'header', 'footer', 'nav', 'menu',
-            '.svg', '.ico', 'data:image', 'base64',
-            'chevron', 'arrow', 'close', 'search', 'cart',
-        ]
-        
-        for pattern in skip_patterns:
-            if pattern in img_url_lower:
-                return False
+        if self._SKIP_IMAGE_RE.search(img_url_lower):
+            return False
         
         # Prefer common product image formats
-        valid_extensions = ['.jpg', '.jpeg', '.png', '.webp', '.gif']
-        has_valid_extension = any(img_url_lower.endswith(ext) for ext in valid_extensions)
+        has_valid_extension = img_url_lower.endswith(self._VALID_IMAGE_EXTENSIONS)
         
         # If it has a valid extension or contains product-related keywords, it's likely valid
         if has_valid_extension:
             return True
         
         # Check for product-related keywords
-        product_keywords = ['product', 'item', 'image', 'photo', 'picture', 'thumb']
-        if any(keyword in img_url_lower for keyword in product_keywords):
+        if self._PRODUCT_IMAGE_KEYWORD_RE.search(img_url_lower):
             return True
         
         # If URL is very short or looks like an icon path, skip it
@@ -776,7 +970,10 @@ class HTMLProductParser:
         products = []
         
         # Find elements with itemtype containing "Product"
-        product_elems = soup.find_all(attrs={'itemtype': re.compile(r'Product', re.I)})
+        product_elems = [
+            elem for elem in self._page_nodes(soup)['itemtypes']
+            if self._PRODUCT_ITEMTYPE_RE.search(elem['itemtype'])
+        ]
         
         for elem in product_elems[:max_items]:
             product = {}
@@ -789,14 +986,14 @@ class HTMLProductParser:
             # URL
             url_elem = elem.find(attrs={'itemprop': 'url'})
             if url_elem:
-                product['product_url'] = urljoin(base_url, url_elem.get('href') or url_elem.get('content'))
+                product['product_url'] = _resolve(base_url, url_elem.get('href') or url_elem.get('content'))
             
             # Image
             img_elem = elem.find(attrs={'itemprop': 'image'})
             if img_elem:
                 img_url = self._get_image_url_from_element(img_elem) or img_elem.get('content') or img_elem.get('href')
                 if img_url and self._is_valid_product_image(img_url):
-                    product['image_url'] = urljoin(base_url, img_url)
+                    product['image_url'] = _resolve(base_url, img_url)
             
             # If no image found via itemprop, try comprehensive search
             if 'image_url' not in product or not product['image_url']:
@@ -821,9 +1018,10 @@ class HTMLProductParser:
         products = []
         
         # Find script tags with JSON data (but not ld+json)
-        scripts = soup.find_all('script', type=['application/json', 'text/javascript'])
+        all_scripts = self._page_nodes(soup)['scripts']
+        scripts = [s for s in all_scripts if s.get('type') in ('application/json', 'text/javascript')]
         # Also check scripts without type (might contain JSON)
-        scripts.extend([s for s in soup.find_all('script') if s not in scripts and s.string])
+        scripts.extend([s for s in all_scripts if s not in scripts and s.string])
         
         for script in scripts:
             if not script.string:
@@ -832,7 +1030,7 @@ class HTMLProductParser:
             try:
                 # Try to parse entire script as JSON (for window.__INITIAL_STATE__ etc.)
                 try:
-                    data = json.loads(script.string)
+                    data = loads_json(script.string)
                     # Only process if data is a dict or list
                     if isinstance(data, (dict, list)):
                         # Look for product arrays or objects
@@ -851,32 +1049,11 @@ class HTMLProductParser:
                 script_content = script.string
                 
                 # Look for common JavaScript variable patterns - use more aggressive matching
-                js_patterns = [
-                    # React/Next.js state patterns (non-greedy to avoid matching too much)
-                    (r'window\.__INITIAL_STATE__\s*=\s*(\{.*?"products".*?\})', re.DOTALL),
-                    (r'window\.__PRELOADED_STATE__\s*=\s*(\{.*?"products".*?\})', re.DOTALL),
-                    (r'__NEXT_DATA__\s*=\s*(\{.*?"products".*?\})', re.DOTALL),
-                    # Product arrays - be more aggressive
-                    (r'"products"\s*:\s*(\[[^\]]+\])', re.DOTALL),
-                    (r'"items"\s*:\s*(\[[^\]]+\])', re.DOTALL),
-                    (r'"data"\s*:\s*(\[[^\]]+\])', re.DOTALL),
-                    (r'"results"\s*:\s*(\[[^\]]+\])', re.DOTALL),
-                    # Meesho and other platforms might use different keys
-                    (r'"catalog"\s*:\s*(\[[^\]]+\])', re.DOTALL),
-                    (r'"list"\s*:\s*(\[[^\]]+\])', re.DOTALL),
-                ]
-                
-                for pattern_info in js_patterns:
-                    if isinstance(pattern_info, tuple):
-                        pattern, flags = pattern_info
-                    else:
-                        pattern = pattern_info
-                        flags = re.I | re.DOTALL
-                    
-                    matches = re.findall(pattern, script_content, flags)
+                for js_pattern in self._JS_STATE_PATTERNS:
+                    matches = js_pattern.findall(script_content)
                     for match in matches:
                         try:
-                            data = json.loads(match)
+                            data = loads_json(match)
                             if isinstance(data, (dict, list)):
                                 found = self._find_products_in_jsonld(data, base_url)
                                 products.extend(found)
@@ -884,57 +1061,16 @@ class HTMLProductParser:
                                     return products[:max_items]
                         except (json.JSONDecodeError, TypeError, ValueError):
                             continue
-                    
-                    # Also try to find the pattern and extract larger context
-                    if '"products"' in pattern or '"items"' in pattern or '"data"' in pattern:
-                        # Try to extract larger JSON structures
-                        try:
-                            # Find the key and extract the array
-                            key_match = re.search(r'("products"|"items"|"data"|"results"|"catalog"|"list")\s*:\s*(\[)', script_content, re.I)
-                            if key_match:
-                                # Try to extract balanced brackets
-                                start_pos = key_match.end()
-                                bracket_count = 1
-                                end_pos = start_pos
-                                for i, char in enumerate(script_content[start_pos:], start_pos):
-                                    if char == '[':
-                                        bracket_count += 1
-                                    elif char == ']':
-                                        bracket_count -= 1
-                                        if bracket_count == 0:
-                                            end_pos = i + 1
-                                            break
-                                
-                                if end_pos > start_pos:
-                                    array_str = script_content[start_pos:end_pos]
-                                    try:
-                                        data = json.loads(array_str)
-                                        if isinstance(data, list) and len(data) > 0:
-                                            # Check if items look like products
-                                            for item in data[:max_items]:
-                                                if isinstance(item, dict):
-                                                    product = self._extract_product_from_dict(item, base_url)
-                                                    if product and self._validate_product(product):
-                                                        products.append(product)
-                                                        if len(products) >= max_items:
-                                                            return products[:max_items]
-                                    except (json.JSONDecodeError, TypeError, ValueError):
-                                        pass
-                        except Exception:
-                            pass
                 
-                # Also try simple JSON object patterns
-                simple_patterns = [
-                    r'\{[^{}]*"product"[^{}]*\}',
-                    r'\{[^{}]*"name"[^{}]*"url"[^{}]*\}',
-                    r'\{[^{}]*"title"[^{}]*"link"[^{}]*\}',
-                ]
+                # Also try simple (brace-free) JSON objects: collect them in one
+                # linear pass, then filter per key pattern in the original order
+                flat_objects = self._FLAT_OBJECT_RE.findall(script_content)
                 
-                for pattern in simple_patterns:
-                    json_matches = re.findall(pattern, script_content, re.I | re.DOTALL)
+                for key_re in self._SIMPLE_OBJECT_KEY_RES:
+                    json_matches = [obj for obj in flat_objects if key_re.search(obj)]
                     for match in json_matches:
                         try:
-                            data = json.loads(match)
+                            data = loads_json(match)
                             if isinstance(data, dict):
                                 product = self._extract_product_from_dict(data, base_url)
                                 if product and self._validate_product(product):
@@ -943,11 +1079,63 @@ class HTMLProductParser:
                                         return products[:max_items]
                         except (json.JSONDecodeError, TypeError):
                             continue
+                
+                # Then the larger "products"/"items"/... array, for items the flat scan
+                # can't see (nested objects); items it already found are skipped. The
+                # key search doesn't depend on the pattern, so this runs once per script
+                key_match = self._JS_ARRAY_KEY_RE.search(script_content)
+                if key_match:
+                    end_pos = self._find_array_end(script_content, key_match.end())
+                    if end_pos != -1:
+                        array_str = script_content[key_match.start(2):end_pos]
+                        try:
+                            data = loads_json(array_str)
+                            if isinstance(data, list) and len(data) > 0:
+                                # Check if items look like products
+                                seen_urls = {p.get('product_url') for p in products}
+                                for item in data[:max_items]:
+                                    if isinstance(item, dict):
+                                        product = self._extract_product_from_dict(item, base_url)
+                                        if product and self._validate_product(product):
+                                            if product.get('product_url') in seen_urls:
+                                                continue
+                                            seen_urls.add(product.get('product_url'))
+                                            products.append(product)
+                                            if len(products) >= max_items:
+                                                return products[:max_items]
+                        except (json.JSONDecodeError, TypeError, ValueError):
+                            pass
             except Exception:
                 continue
         
         return products[:max_items]
     
+    def _find_array_end(self, text: str, start: int) -> int:
+        """
+        Find the end of a JSON array whose opening '[' sits just before start.
+        
+        Brackets inside double-quoted strings are skipped, and one regex match
+        jumps from bracket to bracket rather than stepping per character.
+        
+        Returns:
+            Index just past the matching ']', or -1 if the array never closes
+        """
+        depth = 1
+        pos = start
+        skip_to_bracket = self._JSON_SKIP_TO_BRACKET_RE.match
+        while True:
+            pos = skip_to_bracket(text, pos).end()
+            if pos >= len(text) or text[pos] == '"':
+                # Ran out of text, or stopped at a string that never closes
+                return -1
+            if text[pos] == '[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return pos + 1
+            pos += 1
+    
     def _extract_product_from_dict(self, data: Dict, base_url: str) -> Optional[Dict]:
         """Extract product info from a generic dictionary."""
         # Ensure data is a dict
@@ -956,24 +1144,18 @@ class HTMLProductParser:
         
         product = {}
         
-        # Common field mappings
-        title_keys = ['name', 'title', 'productName', 'product_name']
-        url_keys = ['url', 'link', 'productUrl', 'product_url']
-        image_keys = ['image', 'imageUrl', 'img', 'thumbnail']
-        price_keys = ['price', 'cost', 'amount']
-        
         try:
-            for key in title_keys:
+            for key in self._DICT_TITLE_KEYS:
                 if key in data:
                     product['title'] = str(data[key])
                     break
             
-            for key in url_keys:
+            for key in self._DICT_URL_KEYS:
                 if key in data:
-                    product['product_url'] = urljoin(base_url, str(data[key]))
+                    product['product_url'] = _resolve(base_url, str(data[key]))
                     break
             
-            for key in image_keys:
+            for key in self._DICT_IMAGE_KEYS:
                 if key in data:
                     img_value = data[key]
                     if isinstance(img_value, list) and img_value:
@@ -982,10 +1164,10 @@ class HTMLProductParser:
                         img_value = img_value.get('url') or img_value.get('src') or ''
                     img_url = str(img_value) if img_value else ''
                     if img_url and self._is_valid_product_image(img_url):
-                        product['image_url'] = urljoin(base_url, img_url)
+                        product['image_url'] = _resolve(base_url, img_url)
                     break
             
-            for key in price_keys:
+            for key in self._DICT_PRICE_KEYS:
                 if key in data:
                     price, currency = self._parse_price(str(data[key]))
                     if price:
@@ -1004,28 +1186,21 @@ class HTMLProductParser:
         products = []
         
         # Find all links with images
-        links = soup.find_all('a', href=True)
+        links = self._page_nodes(soup)['links']
         
-        for link in links[:max_items * 3]:  # Check more than needed
+        for link in islice(links, max_items * 3):  # Check more than needed
             # Must have an image
             img = link.find('img', src=True)
             if not img:
                 continue
             
             # URL must look like a product
-            url = urljoin(base_url, link['href'])
+            url = _resolve(base_url, link['href'])
             if not self._is_product_url(url):
                 continue
             
-            # Find price nearby (in same parent or ancestor)
-            price_elem = None
-            current = link
-            for _ in range(3):  # Check up to 3 levels up
-                if current:
-                    price_elem = current.find(class_=re.compile(r'price', re.I))
-                    if price_elem:
-                        break
-                    current = current.parent
+            # Find price nearby (in same parent or ancestor, up to 3 levels)
+            price_elem = self._find_nearby_price(link, self._PRICE_CLASS_RE, 3)
             
             if not price_elem:
                 continue
@@ -1033,7 +1208,7 @@ class HTMLProductParser:
             # Build product
             product = {
                 'product_url': url,
-                'image_url': urljoin(base_url, self._get_image_url_from_element(img) or ''),
+                'image_url': _resolve(base_url, self._get_image_url_from_element(img) or ''),
                 'title': self._clean_text(link.get('title') or img.get('alt') or link.get_text())
             }
             
@@ -1054,10 +1229,7 @@ class HTMLProductParser:
         """Last resort: extract any link with image (Strategy 6)."""
         products = []
         
-        # First, try to find all links
-        links = soup.find_all('a', href=True)
-        
-        # Also try to find divs/li that might contain products (even without direct links)
+        # First, try to find divs/li that might contain products (even without direct links)
         # This helps with JavaScript-loaded content
         potential_products = soup.find_all(['div', 'li', 'article'], limit=max_items * 10)
         
@@ -1085,18 +1257,18 @@ class HTMLProductParser:
                 
                 # Only create product if we have image, some text, and it looks like a product
                 text = elem.get_text()
-                if img and text and len(text.strip()) > 10 and len(text.strip()) < 500:
+                if img and text and 10 < len(text.strip()) < 500:
                     # Check if text doesn't look like navigation
                     text_lower = text.lower()
-                    if not any(nav in text_lower for nav in ['home', 'menu', 'login', 'cart', 'search', 'account']):
+                    if not self._NAV_TEXT_RE.search(text_lower):
                         product = {
                             'product_url': base_url,  # Use base URL as fallback
-                            'image_url': urljoin(base_url, self._get_image_url_from_element(img) or ''),
+                            'image_url': _resolve(base_url, self._get_image_url_from_element(img) or ''),
                             'title': self._clean_text(text)[:200]  # Limit title length
                         }
                         
                         # Try to find price
-                        price_elem = elem.find(class_=re.compile(r'price|cost|amount|rs\.?|₹', re.I))
+                        price_elem = elem.find(class_=self._PRICE_CLASS_WIDE_RE)
                         if price_elem:
                             price_text = price_elem.get_text()
                             price, currency = self._parse_price(price_text)
@@ -1109,7 +1281,10 @@ class HTMLProductParser:
                             if len(products) >= max_items:
                                 return products
         
-        # Continue with original link-based extraction
+        # Continue with original link-based extraction (the page's links are
+        # only collected once the card scan above hasn't already filled max_items)
+        links = self._page_nodes(soup)['links']
+        base_netloc = urlparse(base_url).netloc
         
         for link in links:
             # Find image in link or nearby (parent, sibling, ancestor)
@@ -1137,7 +1312,7 @@ class HTMLProductParser:
             if not img:
                 continue
             
-            url = urljoin(base_url, link['href'])
+            url = _resolve(base_url, link['href'])
             
             # Skip invalid URLs
             if not url or url.startswith('javascript:') or url == '#' or url == 'javascript:void(0)':
@@ -1148,27 +1323,26 @@ class HTMLProductParser:
                 continue
             
             # Be very lenient - accept if URL contains domain and looks reasonable
-            parsed_base = urlparse(base_url)
             parsed_link = urlparse(url)
+            path_lower = parsed_link.path.lower()
             
             # Accept if same domain and not obviously a non-product page
-            is_same_domain = parsed_base.netloc == parsed_link.netloc
-            skip_paths = ['/login', '/cart', '/checkout', '/account', '/help', '/contact', '/about', '/terms', '/privacy']
+            is_same_domain = base_netloc == parsed_link.netloc
             
             is_product_like = self._is_product_url(url) or (
                 is_same_domain and 
                 parsed_link.path and 
                 len(parsed_link.path) > 3 and  # Not just "/"
-                not any(skip in parsed_link.path.lower() for skip in skip_paths) and
-                not parsed_link.path.lower().endswith(('.jpg', '.png', '.gif', '.css', '.js', '.svg', '.ico'))  # Not media files
+                not any(skip in path_lower for skip in self._SKIP_LINK_PATHS) and
+                not path_lower.endswith(self._NON_PAGE_EXTENSIONS)  # Not media files
             )
             
             # Also accept relative URLs that look like product pages
             if not is_product_like and not url.startswith('http'):
                 is_product_like = (
                     len(parsed_link.path) > 3 and
-                    not any(skip in parsed_link.path.lower() for skip in skip_paths) and
-                    not parsed_link.path.lower().endswith(('.jpg', '.png', '.gif', '.css', '.js', '.svg', '.ico'))
+                    not any(skip in path_lower for skip in self._SKIP_LINK_PATHS) and
+                    not path_lower.endswith(self._NON_PAGE_EXTENSIONS)
                 )
             
             if not is_product_like:
@@ -1182,34 +1356,28 @@ class HTMLProductParser:
                     '')
             title = self._clean_text(title)
             
-            # Skip if title is too generic or empty
-            generic_titles = ['click here', 'more', 'view', 'link', 'image', 'logo', 'home', 'menu', 'search', 
-                            'cart', 'account', 'login', 'sign in', 'sign up', 'jiomart.com', 'jiomart']
-            if not title or len(title) < 3 or title.lower() in generic_titles or any(gt in title.lower() for gt in generic_titles):
+            # Skip if title is too generic or empty (an exact generic title also
+            # contains itself, so the substring search covers both checks)
+            if not title or len(title) < 3:
+                continue
+            title_lower = title.lower()
+            if self._GENERIC_LINK_TITLE_RE.search(title_lower):
                 continue
             
             # Skip if image URL looks like a logo
             img_src = img.get('src') or img.get('data-src') or img.get('data-lazy-src') or ''
-            if 'logo' in img_src.lower() or 'brand' in img_src.lower() or 'icon' in img_src.lower():
+            img_src_lower = img_src.lower()
+            if 'logo' in img_src_lower or 'brand' in img_src_lower or 'icon' in img_src_lower:
                 continue
             
             product = {
                 'product_url': url,
-                'image_url': urljoin(base_url, self._get_image_url_from_element(img) or ''),
+                'image_url': _resolve(base_url, self._get_image_url_from_element(img) or ''),
                 'title': title
             }
             
-            # Try to find price nearby
-            price_elem = None
-            current = link
-            for _ in range(5):  # Check up to 5 levels up
-                if current and hasattr(current, 'find'):
-                    price_elem = current.find(class_=re.compile(r'price|cost|amount|rs\.?|₹', re.I))
-                    if price_elem:
-                        break
-                    current = current.parent if hasattr(current, 'parent') else None
-                else:
-                    break
+            # Try to find price nearby (up to 5 levels up)
+            price_elem = self._find_nearby_price(link, self._PRICE_CLASS_WIDE_RE, 5)
             
             if price_elem:
                 price_text = price_elem.get_text()
@@ -1227,6 +1395,65 @@ class HTMLProductParser:
     
     # ============ Utility Methods ============
     
+    def _page_nodes(self, soup: BeautifulSoup) -> Dict[str, List[Tag]]:
+        """
+        Collect a page's <script>, <a href> and [itemtype] tags in one tree walk.
+        
+        The JSON-LD, microdata, inline-script, heuristic and fallback strategies
+        all scan for these, so the lists are built on first use and shared for
+        the rest of the page. Callers must not modify them.
+        """
+        cached = self._page_node_cache
+        if cached is not None and cached[0] is soup:
+            return cached[1]
+        
+        scripts = []
+        links = []
+        itemtypes = []
+        for elem in soup.descendants:
+            if type(elem) is Tag:
+                if elem.name == 'script':
+                    scripts.append(elem)
+                elif elem.name == 'a' and 'href' in elem.attrs:
+                    links.append(elem)
+                if 'itemtype' in elem.attrs:
+                    itemtypes.append(elem)
+        
+        nodes = {'scripts': scripts, 'links': links, 'itemtypes': itemtypes}
+        self._page_node_cache = (soup, nodes)
+        return nodes
+    
+    def _find_nearby_price(self, node: Tag, class_re: re.Pattern, levels: int) -> Optional[Tag]:
+        """
+        Find the first element with a price-like class under node or its nearest ancestors.
+        
+        Returns what calling find(class_=class_re) on node and then on each of its
+        next levels - 1 ancestors would, but each ancestor only scans the siblings
+        of the level below (and that child itself), not the subtree already covered.
+        """
+        price_elem = node.find(class_=class_re)
+        if price_elem:
+            return price_elem
+        
+        strainer = SoupStrainer(class_=class_re)
+        child = node
+        for _ in range(levels - 1):
+            parent = child.parent
+            if parent is None:
+                break
+            for sibling in parent.children:
+                if type(sibling) is not Tag:
+                    continue
+                if strainer.search(sibling):
+                    return sibling
+                if sibling is not child:
+                    price_elem = sibling.find(class_=class_re)
+                    if price_elem:
+                        return price_elem
+            child = parent
+        
+        return None
+    
     def _validate_product(self, product: Dict) -> bool:
         """Check if product has minimum required fields."""
         # Must have either (title + URL) or (price + title)
@@ -1246,22 +1473,18 @@ class HTMLProductParser:
         
         # Title must not be generic navigation text
         title_lower = product['title'].lower()
-        if title_lower in ['home', 'about', 'contact', 'cart', 'login', 'search']:
+        if title_lower in self._NAV_TITLES:
             return False
         
         return True
     
     def _is_product_url(self, url: str) -> bool:
         """Check if URL looks like a product page."""
-        for pattern in self.product_url_patterns:
-            if re.search(pattern, url, re.I):
-                return True
-        return False
+        return self._product_url_check(url)
     
     def _is_blacklisted(self, url: str) -> bool:
         """Check if URL is blacklisted."""
-        url_lower = url.lower()
-        return any(keyword in url_lower for keyword in self.blacklist_keywords)
+        return self._blacklist_check(url)
     
     def _dedupe_by_url(self, products: List[Dict]) -> List[Dict]:
         """Remove duplicate products by URL."""
@@ -1271,13 +1494,12 @@ class HTMLProductParser:
             if not url:
                 continue
             
-            if url not in seen:
-                seen[url] = product
-            else:
+            existing = seen.setdefault(url, product)
+            if existing is not product:
                 # Merge fields (keep first, fill missing)
                 for key, value in product.items():
-                    if key not in seen[url] and value:
-                        seen[url][key] = value
+                    if key not in existing and value:
+                        existing[key] = value
         
         return list(seen.values())
     
@@ -1298,9 +1520,9 @@ class HTMLProductParser:
             currency = 'USD'
         
         # Extract numeric value
-        numbers = re.findall(r'[\d,]+\.?\d*', text)
-        if numbers:
-            price_str = numbers[0].replace(',', '')
+        number = self._PRICE_NUMBER_RE.search(text)
+        if number:
+            price_str = number.group().replace(',', '')
             try:
                 return float(price_str), currency
             except ValueError:
@@ -1314,7 +1536,7 @@ class HTMLProductParser:
             return None
         
         # Find first decimal number
-        match = re.search(r'(\d+\.?\d*)\s*(?:out of|\/|\|)?', text)
+        match = self._RATING_RE.search(text)
         if match:
             try:
                 return float(match.group(1))
@@ -1330,11 +1552,11 @@ class HTMLProductParser:
         
         # Remove commas and find numbers
         text = text.replace(',', '')
-        numbers = re.findall(r'\d+', text)
+        number = self._DIGITS_RE.search(text)
         
-        if numbers:
+        if number:
             try:
-                return int(numbers[0])
+                return int(number.group())
             except ValueError:
                 pass
         
@@ -1344,10 +1566,27 @@ class HTMLProductParser:
         """Normalize whitespace and trim text."""
         if not text:
             return ''
-        return ' '.join(text.split()).strip()
+        return ' '.join(text.split())  # split() already drops leading/trailing whitespace
     
     def _extract_platform(self, url: str) -> str:
         """Extract platform name from URL."""
         parsed = urlparse(url)
         domain = parsed.netloc.replace('www.', '')
-        return domain.split('.')[0] if domain else 'unknown'
\ No newline at end of file
+        return domain.split('.')[0] if domain else 'unknown'
+
+# Process-pool entry points. Each worker process builds one parser (via
+# init_worker_parser as the pool initializer) and reuses it for every document.
+_worker_parser: Optional[HTMLProductParser] = None
+
+
+def init_worker_parser() -> None:
+    """Build the per-process parser; pass as ProcessPoolExecutor's initializer."""
+    global _worker_parser
+    _worker_parser = HTMLProductParser()
+
+
+def parse_html_in_worker(html_content: str, source_url: str, max_items: int = 100) -> Dict[str, Any]:
+    """Parse one document with the per-process parser (picklable pool task)."""
+    if _worker_parser is None:
+        init_worker_parser()
+    return _worker_parser.parse_html(html_content, source_url, max_items=max_items)
@@ -7,30 +7,42 @@ Features:
 - Fetches batches of 100 URLs from product_page_urls table
 - Claims URLs to prevent duplicate processing
 - Fetches HTML via Railway private networking
+- Fetches the next batch while the current one is being extracted
 - Extracts products and saves to r_product_data table
 - Updates processing status in product_page_urls table
 - Runs continuously in infinite loop
 """
 
 import os
+import math
+import signal
 import time
+import random
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+import orjson
 import logging
 import socket
 import uuid
-from datetime import datetime
-from typing import List, Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Semaphore, Lock
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional, Iterator, Iterable
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from threading import Semaphore, Lock, Thread, Event, local
+from queue import Queue
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase import create_client, Client, ClientOptions
 
 # Load environment variables first
 load_dotenv()
 
 # Import parser after env is loaded
 try:
-    from html_parser import HTMLProductParser
+    from html_parser import HTMLProductParser, init_worker_parser, parse_html_in_worker
 except ImportError as e:
     print(f"CRITICAL: Failed to import html_parser: {e}")
     print("Make sure html_parser.py exists in the same directory")
@@ -53,16 +65,28 @@ logger.info("Product Extraction Worker Starting...")
 logger.info("=" * 60)
 
 # Initialize parser
+_WARMUP_HTML = '<html><head></head><body></body></html>'
 try:
     parser = HTMLProductParser()
+    # One throwaway parse runs every strategy once, so bs4's lazy imports and the
+    # CSS selector compilation happen here instead of on the first real URL
+    parser.parse_html(_WARMUP_HTML, 'about:blank')
     logger.info("HTML parser initialized successfully")
 except Exception as e:
     logger.error(f"Failed to initialize HTML parser: {e}", exc_info=True)
     raise
 
+# Extraction threads each get their own parser (see _get_parser) so per-parse
+# state never crosses threads; the one above doubles as the main thread's
+_parser_local = local()
+_parser_local.parser = parser
+
 # Initialize Supabase client
 SUPABASE_URL = os.getenv('SUPABASE_URL', '')
 SUPABASE_KEY = os.getenv('SUPABASE_KEY', '')
+# Per-request timeout for Supabase calls, so a hung PostgREST request fails fast
+# instead of pinning an extraction thread (supabase-py defaults to 120s)
+SUPABASE_TIMEOUT = int(os.getenv('SUPABASE_TIMEOUT', '30'))  # seconds
 supabase: Optional[Client] = None
 
 if not SUPABASE_URL or not SUPABASE_KEY:
@@ -73,12 +97,21 @@ if not SUPABASE_URL or not SUPABASE_KEY:
     raise ValueError(error_msg)
 
 try:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    supabase = create_client(
+        SUPABASE_URL,
+        SUPABASE_KEY,
+        options=ClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT)
+    )
     logger.info("Supabase client initialized successfully")
 except Exception as e:
     logger.error(f"Failed to initialize Supabase client: {e}", exc_info=True)
     raise
 
+# Table handles are stateless request builders (each insert/select/update starts
+# a fresh query), so build them once instead of on every call
+url_table = supabase.table('product_page_urls')
+product_table = supabase.table('r_product_data')
+
 # Railway URL-to-HTML service (public HTTPS API)
 URLTOHTML_URL = os.getenv(
     "URLTOHTML_URL",
@@ -89,8 +122,25 @@ URLTOHTML_URL = os.getenv(
 BATCH_SIZE = int(os.getenv('WORKER_BATCH_SIZE', '100'))
 WORKER_ID = os.getenv('WORKER_ID', socket.gethostname() or str(uuid.uuid4())[:8])
 POLL_INTERVAL = int(os.getenv('POLL_INTERVAL', '5'))  # seconds between batches
+CLAIM_ATTEMPTS = int(os.getenv('CLAIM_ATTEMPTS', '3'))  # re-selects when another worker claims a whole batch first
+# Comma-separated substrings; pending URLs containing any of them (case-insensitive) are
+# left unclaimed. Meesho links are temporarily excluded by default (to be removed later).
+EXCLUDED_URL_KEYWORDS = [
+    keyword.strip() for keyword in os.getenv('EXCLUDED_URL_KEYWORDS', 'meesho').split(',') if keyword.strip()
+]
+# PostgREST reads '*' in a like pattern as the '%' wildcard and it can't be escaped,
+# so such a keyword would exclude unrelated URLs
+if any('*' in keyword for keyword in EXCLUDED_URL_KEYWORDS):
+    logger.warning("Ignoring EXCLUDED_URL_KEYWORDS entries containing '*' (it acts as a wildcard)")
+    EXCLUDED_URL_KEYWORDS = [keyword for keyword in EXCLUDED_URL_KEYWORDS if '*' not in keyword]
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
 RETRY_DELAY = int(os.getenv('RETRY_DELAY', '10'))  # seconds
+CONNECT_RETRY_DELAY = float(os.getenv('CONNECT_RETRY_DELAY', '1'))  # seconds; for requests that never got a connection
+MAX_RETRY_AFTER = int(os.getenv('MAX_RETRY_AFTER', '300'))  # cap on a server-sent Retry-After, in seconds
+# A batch's URLs are sent to the URL-to-HTML service as several smaller concurrent
+# requests, so one stalled page only holds up its own chunk. 0 sends one request.
+FETCH_CHUNK_SIZE = int(os.getenv('FETCH_CHUNK_SIZE', '20'))  # URLs per request
+FETCH_CONCURRENCY = int(os.getenv('FETCH_CONCURRENCY', '5'))  # chunk requests in flight at once
 
 # Parallel processing configuration
 # Use MAX_WORKERS if set (for backward compatibility), otherwise use EXTRACTION_WORKERS
@@ -101,15 +151,56 @@ EXTRACTION_WORKERS = int(os.getenv('MAX_WORKERS', os.getenv('EXTRACTION_WORKERS'
 # Database connection throttling - limit concurrent Supabase operations
 # With 50 workers, we need to throttle DB operations to avoid connection pool exhaustion
 MAX_CONCURRENT_DB_OPS = int(os.getenv('MAX_CONCURRENT_DB_OPS', '10'))  # Max concurrent DB operations
+DB_INSERT_BATCH_SIZE = int(os.getenv('DB_INSERT_BATCH_SIZE', '500'))  # Rows per insert request (Supabase max: 1000)
+DB_MAX_RETRIES = int(os.getenv('DB_MAX_RETRIES', '3'))  # Attempts per insert request
+# Bounds in-flight Supabase requests; the client itself is safe to share across
+# threads (each call builds its own request on a pooled httpx client)
 db_semaphore = Semaphore(MAX_CONCURRENT_DB_OPS)  # Semaphore to limit concurrent DB operations
-db_lock = Lock()  # Lock for thread-safe operations
+
+# Extraction result cache - keyed by (HTML digest, source URL), so an identical page
+# is only parsed once. Only the parse is cached; DB saves and status updates always run.
+EXTRACTION_CACHE_SIZE = int(os.getenv('EXTRACTION_CACHE_SIZE', '1024'))  # 0 disables the cache
+_extraction_cache: 'OrderedDict[tuple, Dict[str, Any]]' = OrderedDict()
+_extraction_cache_lock = Lock()
+
+# Parsing is CPU-bound and holds the GIL, so extraction threads can hand it to a
+# process pool instead. 0 keeps parsing in the extraction threads.
+PARSE_PROCESSES = int(os.getenv('PARSE_PROCESSES', '0'))
+_parse_pool: Optional[ProcessPoolExecutor] = None
 
 # Create requests session for URL-to-HTML service
 session = requests.Session()
 session.headers.update({
     'Content-Type': 'application/json',
-    'User-Agent': 'ProductWorker/1.0'
+    'User-Agent': 'ProductWorker/1.0',
+    'Accept-Encoding': 'gzip, deflate',  # Batch responses carry full page HTML
+    'Connection': 'keep-alive',
 })
+# Keep connections to the HTML service pooled across batches; retries stay in
+# fetch_html_from_railway so urllib3 must not retry underneath it
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '16'))
+_http_adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+session.mount('https://', _http_adapter)
+session.mount('http://', _http_adapter)
+
+
+def _select_pending_urls(columns: str, **select_options):
+    """
+    Query builder for pending URLs this worker may process.
+    
+    URLs matching EXCLUDED_URL_KEYWORDS are filtered here rather than claimed
+    and marked failed, so they stay pending and don't take up batch slots.
+    """
+    query = url_table.select(columns, **select_options).eq('processing_status', 'pending')
+    for keyword in EXCLUDED_URL_KEYWORDS:
+        query = query.not_.ilike('product_page_url', _contains_pattern(keyword))
+    return query
+
+
+def _contains_pattern(keyword: str) -> str:
+    """LIKE pattern matching keyword anywhere, with '%', '_' and '\\' in it taken literally."""
+    escaped = keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
 
 
 def fetch_pending_urls(batch_size: int = BATCH_SIZE) -> List[Dict[str, Any]]:
@@ -126,22 +217,39 @@ def fetch_pending_urls(batch_size: int = BATCH_SIZE) -> List[Dict[str, Any]]:
         logger.error("Supabase client not initialized")
         return []
     
+    for _ in range(CLAIM_ATTEMPTS):
+        urls = _claim_pending_urls(batch_size)
+        if urls is not None:
+            return urls
+    
+    logger.info(f"Other workers claimed every fetched batch ({CLAIM_ATTEMPTS} attempts)")
+    return []
+
+
+def _claim_pending_urls(batch_size: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Select up to batch_size pending URLs and claim whichever are still pending.
+    
+    Returns:
+        The claimed URL records ([] if nothing is pending or on error), or None
+        if rows were found but another worker claimed all of them first
+    """
     try:
-        # First, check total pending count for logging
-        count_response = supabase.table('product_page_urls').select(
-            'id', count='exact'
-        ).eq('processing_status', 'pending').execute()
+        # First, check total pending count for logging. An exact count scans every
+        # pending row on each poll; the estimate comes from the query planner (PostgREST
+        # only counts exactly for small results), and head=True skips the row payload.
+        count_response = _select_pending_urls('id', count='estimated', head=True).execute()
         
         total_pending = count_response.count if hasattr(count_response, 'count') else None
         
         # Fetch pending URLs ordered by ID for consistent batching
-        response = supabase.table('product_page_urls').select(
+        response = _select_pending_urls(
             'id, product_type_id, product_page_url, retry_count'
-        ).eq('processing_status', 'pending').order('id', desc=False).limit(batch_size).execute()
+        ).order('id', desc=False).limit(batch_size).execute()
         
         if not response.data:
             if total_pending is not None:
-                logger.info(f"No pending URLs found (Total pending in DB: {total_pending})")
+                logger.info(f"No pending URLs found (Total pending in DB, estimated: {total_pending})")
             else:
                 logger.info("No pending URLs found")
             return []
@@ -156,7 +264,7 @@ def fetch_pending_urls(batch_size: int = BATCH_SIZE) -> List[Dict[str, Any]]:
         # Log detailed batch information
         logger.info("=" * 60)
         logger.info(f"FETCHED BATCH FROM SUPABASE")
-        logger.info(f"  Total pending URLs in DB: {total_pending if total_pending is not None else 'unknown'}")
+        logger.info(f"  Total pending URLs in DB (estimated): {total_pending if total_pending is not None else 'unknown'}")
         logger.info(f"  Fetched: {len(urls)} URLs")
         logger.info(f"  ID Range: {min_id} to {max_id} (span: {max_id - min_id + 1} IDs)")
         logger.info(f"  Sample URLs:")
@@ -169,14 +277,23 @@ def fetch_pending_urls(batch_size: int = BATCH_SIZE) -> List[Dict[str, Any]]:
         # Claim the URLs by updating their status
         claim_timestamp = datetime.utcnow().isoformat()
         
-        # Update all URLs to 'processing' status and set claim info
-        update_response = supabase.table('product_page_urls').update({
+        # Update the URLs to 'processing' status and set claim info. Only rows that
+        # are still pending get updated, so a row another worker claimed after our
+        # SELECT isn't processed twice; the update returns the rows it changed.
+        update_response = url_table.update({
             'processing_status': 'processing',
             'claimed_by': WORKER_ID,
             'claimed_at': claim_timestamp
-        }).in_('id', url_ids).execute()
+        }).in_('id', url_ids).eq('processing_status', 'pending').execute()
         
-        logger.info(f"✓ Claimed {len(url_ids)} URLs for processing (IDs: {min_id}-{max_id})")
+        claimed_ids = {row['id'] for row in update_response.data or []}
+        if len(claimed_ids) < len(urls):
+            logger.info(f"{len(urls) - len(claimed_ids)} of {len(urls)} fetched URLs were already claimed by another worker")
+            urls = [url for url in urls if url['id'] in claimed_ids]
+            if not urls:
+                return None
+        
+        logger.info(f"✓ Claimed {len(urls)} URLs for processing (IDs: {min_id}-{max_id})")
         
         return urls
         
@@ -186,6 +303,51 @@ def fetch_pending_urls(batch_size: int = BATCH_SIZE) -> List[Dict[str, Any]]:
         return []
 
 
+def _backoff_delay(base: float, attempt: int) -> float:
+    """
+    Exponential backoff with jitter: base * 2**attempt, scaled by a random 0.5-1.5.
+    
+    Extraction threads and other workers that failed together would otherwise
+    all retry at the same instant and hit the service or database at once.
+    """
+    return base * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+def _never_connected(error: requests.exceptions.ConnectionError) -> bool:
+    """
+    Whether a ConnectionError happened before a connection was made.
+    
+    requests also raises ConnectionError when an established connection is
+    aborted after the request was sent ("Connection aborted"), in which case the
+    service may already be working on it.
+    """
+    reason = error.args[0] if error.args else None
+    reason = getattr(reason, 'reason', reason)  # MaxRetryError wraps the underlying error
+    # NewConnectionError covers refused connections and failed DNS lookups
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Return the wait requested by a Retry-After header (seconds or HTTP-date), capped at MAX_RETRY_AFTER."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        delay = float(value)
+        # float() also accepts 'nan', 'inf' and negative numbers, none of which is a valid wait
+        if not math.isfinite(delay) or delay < 0:
+            return None
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(delay, 0.0), MAX_RETRY_AFTER)
+
+
 def fetch_html_from_railway(urls: List[str]) -> List[Dict[str, Any]]:
     """
     Fetch HTML content from Railway URL-to-HTML service via HTTPS API.
@@ -200,9 +362,6 @@ def fetch_html_from_railway(urls: List[str]) -> List[Dict[str, Any]]:
     if not urls:
         return []
     
-    logger.info(f"Sending {len(urls)} URLs to API...")
-    logger.info(f"API: {URLTOHTML_URL}")
-    
     payload = {"urls": urls}
     
     for attempt in range(MAX_RETRIES):
@@ -216,99 +375,86 @@ def fetch_html_from_railway(urls: List[str]) -> List[Dict[str, Any]]:
             
             # Check if request was successful (status code 200)
             if response.status_code == 200:
-                data = response.json()
+                # The body carries every page's full HTML; orjson decodes it several
+                # times faster than the stdlib json behind response.json()
+                data = orjson.loads(response.content)
                 
-                # Parse summary exactly as in the example
+                # A batch is fetched as several of these calls; fetch_batch_html logs
+                # the combined results, so each call only gets a debug line
                 summary = data.get("summary", {})
-                logger.info("=" * 60)
-                logger.info("API RESULTS")
-                logger.info("=" * 60)
-                logger.info(f"Total URLs: {summary.get('total', 0)}")
-                logger.info(f"Successful: {summary.get('success', 0)}")
-                logger.info(f"Failed: {summary.get('failed', 0)}")
-                logger.info(f"Success Rate: {summary.get('success_rate', 0):.2f}%")
-                logger.info(f"Total Time: {summary.get('total_time', 0):.2f} seconds")
-                
-                # Print results by method
-                by_method = summary.get('by_method', {})
-                if by_method:
-                    logger.info("Results by Method:")
-                    for method, count in by_method.items():
-                        logger.info(f"  {method}: {count}")
-                
-                # Get results array
-                results = data.get("results", [])
-                
-                # Show successful URLs
-                successful = [r for r in results if r.get("status") == "success"]
-                if successful:
-                    logger.info(f"Successful URLs ({len(successful)}):")
-                    for result in successful[:5]:  # Show first 5
-                        html_size = len(result.get("html", ""))
-                        logger.info(f"  ✓ {result['url']}")
-                        logger.info(f"    Method: {result.get('method', 'unknown')}, Size: {html_size:,} bytes")
-                    if len(successful) > 5:
-                        logger.info(f"    ... and {len(successful) - 5} more successful")
-                
-                # Show failed URLs
-                failed = [r for r in results if r.get("status") == "failed"]
-                if failed:
-                    logger.info(f"Failed URLs ({len(failed)}):")
-                    for result in failed[:5]:  # Show first 5
-                        logger.info(f"  ✗ {result['url']}")
-                        logger.info(f"    Error: {result.get('error', 'Unknown error')[:100]}")
-                    if len(failed) > 5:
-                        logger.info(f"    ... and {len(failed) - 5} more failed")
-                
-                logger.info("=" * 60)
+                logger.debug("Fetched chunk of %d URLs: %s successful, %s failed, %s seconds",
+                             len(urls), summary.get('success', 0), summary.get('failed', 0),
+                             summary.get('total_time', 0))
                 
-                return results
+                return data.get("results", [])
             else:
                 # Handle non-200 status codes
                 error_text = response.text[:500]  # Limit error text length
                 logger.error(f"Error: API returned status {response.status_code}")
                 logger.error(f"Response: {error_text}")
                 
-                # For rate limiting (429), wait longer before retry
-                if response.status_code == 429:
-                    wait_time = RETRY_DELAY * (2 ** attempt) * 2  # Double wait for rate limits
-                    logger.warning(f"Rate limited. Waiting {wait_time} seconds before retry...")
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(wait_time)
-                        continue
+                # Only timeouts, rate limits and server errors can succeed on a retry;
+                # any other 4xx means the request itself was rejected
+                status_code = response.status_code
+                retryable = status_code >= 500 or status_code in (408, 429)
                 
-                # For other errors, try to parse response if possible
+                if retryable and attempt < MAX_RETRIES - 1:
+                    # Prefer the server's own Retry-After over our backoff schedule
+                    delay = _retry_after_seconds(response)
+                    if delay is None:
+                        delay = _backoff_delay(RETRY_DELAY, attempt)
+                        if status_code == 429:
+                            delay *= 2  # Double wait for rate limits
+                    if status_code == 429:
+                        logger.warning(f"Rate limited. Waiting {delay:.1f} seconds before retry...")
+                    else:
+                        logger.info(f"Retrying in {delay:.1f} seconds...")
+                    time.sleep(delay)
+                    continue
+                
+                # Not retrying - try to parse response for an error message if possible
                 try:
-                    error_data = response.json()
-                    error_msg = error_data.get('error', error_data.get('message', f'HTTP {response.status_code}'))
+                    error_data = orjson.loads(response.content)
+                    error_msg = error_data.get('error', error_data.get('message', f'HTTP {status_code}'))
                 except:
-                    error_msg = f'HTTP {response.status_code}: {error_text}'
+                    error_msg = f'HTTP {status_code}: {error_text}'
                 
-                if attempt < MAX_RETRIES - 1:
-                    delay = RETRY_DELAY * (2 ** attempt)
-                    logger.info(f"Retrying in {delay} seconds...")
-                    time.sleep(delay)
-                    continue
-                else:
-                    # Return failed results for all URLs
-                    return [{'url': url, 'html': '', 'status': 'failed', 'error': error_msg} for url in urls]
+                # Return failed results for all URLs
+                return [{'url': url, 'html': '', 'status': 'failed', 'error': error_msg} for url in urls]
             
         except requests.exceptions.Timeout as e:
             logger.error(f"Attempt {attempt + 1}/{MAX_RETRIES} timed out: {e}")
             if attempt < MAX_RETRIES - 1:
-                delay = RETRY_DELAY * (2 ** attempt)
-                logger.info(f"Retrying in {delay} seconds...")
+                delay = _backoff_delay(RETRY_DELAY, attempt)
+                logger.info(f"Retrying in {delay:.1f} seconds...")
                 time.sleep(delay)
             else:
                 logger.error("All retry attempts exhausted due to timeout")
                 return [{'url': url, 'html': '', 'status': 'failed', 'error': f'Request timeout: {str(e)}'} for url in urls]
                 
-        except requests.exceptions.RequestException as e:
+        except requests.exceptions.ConnectionError as e:
+            never_connected = _never_connected(e)
+            if never_connected:
+                logger.error(f"Attempt {attempt + 1}/{MAX_RETRIES} could not connect: {e}")
+            else:
+                logger.error(f"Attempt {attempt + 1}/{MAX_RETRIES} lost its connection: {e}")
+            
+            if attempt < MAX_RETRIES - 1:
+                # A request that never got a connection can be resent after a short pause;
+                # one whose connection dropped may still be running server-side
+                delay = _backoff_delay(CONNECT_RETRY_DELAY if never_connected else RETRY_DELAY, attempt)
+                logger.info(f"Retrying in {delay:.1f} seconds...")
+                time.sleep(delay)
+            else:
+                logger.error("All retry attempts exhausted for HTML fetching")
+                return [{'url': url, 'html': '', 'status': 'failed', 'error': str(e)} for url in urls]
+                
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             logger.error(f"Attempt {attempt + 1}/{MAX_RETRIES} failed: {e}")
             
             if attempt < MAX_RETRIES - 1:
-                delay = RETRY_DELAY * (2 ** attempt)  # Exponential backoff
-                logger.info(f"Retrying in {delay} seconds...")
+                delay = _backoff_delay(RETRY_DELAY, attempt)  # Exponential backoff
+                logger.info(f"Retrying in {delay:.1f} seconds...")
                 time.sleep(delay)
             else:
                 logger.error("All retry attempts exhausted for HTML fetching")
@@ -321,6 +467,107 @@ def fetch_html_from_railway(urls: List[str]) -> List[Dict[str, Any]]:
     return []
 
 
+def fetch_html_in_chunks(urls: List[str]) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Fetch HTML for URLs as concurrent requests of up to FETCH_CHUNK_SIZE URLs each.
+    
+    Every chunk goes through fetch_html_from_railway on its own, so it is retried
+    independently and a failing chunk does not resend the others.
+    
+    Args:
+        urls: List of URLs to fetch HTML for
+        
+    Yields:
+        Results of one chunk at a time, as each chunk's request completes
+    """
+    if FETCH_CHUNK_SIZE <= 0 or len(urls) <= FETCH_CHUNK_SIZE:
+        yield fetch_html_from_railway(urls)
+        return
+    
+    chunks = [urls[i:i + FETCH_CHUNK_SIZE] for i in range(0, len(urls), FETCH_CHUNK_SIZE)]
+    workers = max(1, min(FETCH_CONCURRENCY, len(chunks)))
+    logger.info(f"Fetching in {len(chunks)} chunks of up to {FETCH_CHUNK_SIZE} URLs ({workers} concurrent requests)")
+    
+    # All chunks are submitted up front, so the remaining requests keep running while
+    # the caller works on the chunks already yielded. fetch_html_from_railway turns
+    # every error into failed results, so result() never raises.
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='html-fetch') as executor:
+        futures = [executor.submit(fetch_html_from_railway, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _get_parser() -> HTMLProductParser:
+    """Return the calling thread's HTMLProductParser, creating it on first use."""
+    thread_parser = getattr(_parser_local, 'parser', None)
+    if thread_parser is None:
+        thread_parser = _parser_local.parser = HTMLProductParser()
+    return thread_parser
+
+
+def start_parse_pool() -> None:
+    """
+    Start the parse process pool if PARSE_PROCESSES is set.
+    
+    Must run before any worker threads exist: every process is spawned and its
+    parser built here, so nothing is forked later from a multi-threaded process.
+    """
+    global _parse_pool
+    if PARSE_PROCESSES <= 0 or _parse_pool is not None:
+        return
+    
+    pool = ProcessPoolExecutor(max_workers=PARSE_PROCESSES, initializer=init_worker_parser)
+    warmup = [pool.submit(parse_html_in_worker, _WARMUP_HTML, 'about:blank') for _ in range(PARSE_PROCESSES)]
+    for future in warmup:
+        future.result()
+    _parse_pool = pool
+    logger.info(f"Parse process pool started with {PARSE_PROCESSES} processes")
+
+
+def stop_parse_pool() -> None:
+    """Shut down the parse process pool, if one was started."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=True)
+        _parse_pool = None
+
+
+def _parse_html(html_content: str, source_url: str) -> Dict[str, Any]:
+    """Parse HTML in the process pool when one is running, otherwise in this thread."""
+    global _parse_pool
+    pool = _parse_pool
+    if pool is not None:
+        try:
+            return pool.submit(parse_html_in_worker, html_content, source_url, 100).result()
+        except BrokenProcessPool:
+            # A parse process died (e.g. OOM-killed); keep the worker alive by parsing in-thread
+            logger.error("Parse process pool is broken, falling back to in-thread parsing")
+            _parse_pool = None
+            # Release the broken pool's management thread and pipes (safe to repeat
+            # when several threads hit the broken pool at once)
+            pool.shutdown(wait=False, cancel_futures=True)
+    return _get_parser().parse_html(html_content, source_url, max_items=100)
+
+
+def _format_product(product: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a parser product dict onto the worker's product schema."""
+    get = product.get  # Bound once; this runs for every extracted product
+    price = get('price')
+    return {
+        'product_name': get('title', ''),
+        'product_url': get('product_url', ''),
+        'image_url': get('image_url', ''),
+        'cost': price,
+        'currency': get('currency', 'USD'),
+        'rating': get('rating'),
+        'review_count': get('review_count'),
+        'brand': get('brand'),
+        'in_stock': get('in_stock', True),
+        'description': get('description', ''),
+        'original_price': get('original_price') or price,
+    }
+
+
 def extract_products_from_html(html_content: str, source_url: str, product_type_id: int) -> Dict[str, Any]:
     """
     Extract products from HTML content.
@@ -333,38 +580,47 @@ def extract_products_from_html(html_content: str, source_url: str, product_type_
     Returns:
         Dict with products list and metadata
     """
+    cache_key = None
+    if EXTRACTION_CACHE_SIZE > 0:
+        digest = hashlib.blake2b(html_content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        cache_key = (digest, source_url)
+        with _extraction_cache_lock:
+            cached = _extraction_cache.get(cache_key)
+            if cached is not None:
+                _extraction_cache.move_to_end(cache_key)
+        if cached is not None:
+            logger.debug("Extraction cache hit for %s", source_url)
+            return {**cached, 'products': list(cached['products'])}
+    
     try:
-        result = parser.parse_html(html_content, source_url, max_items=100)
+        result = _parse_html(html_content, source_url)
         
         # Format products to match database schema
-        formatted_products = []
-        for product in result.get('products', []):
-            formatted_product = {
-                'product_name': product.get('title', ''),
-                'product_url': product.get('product_url', ''),
-                'image_url': product.get('image_url', ''),
-                'cost': product.get('price'),
-                'currency': product.get('currency', 'USD'),
-                'rating': product.get('rating'),
-                'review_count': product.get('review_count'),
-                'brand': product.get('brand'),
-                'in_stock': product.get('in_stock', True),
-                'description': product.get('description', ''),
-                'original_price': product.get('original_price') or product.get('price'),
-            }
+        # (parse_html already caps the list at max_items, so this is built once at final size)
+        formatted_products = [
+            formatted_product
+            for formatted_product in map(_format_product, result.get('products', []))
             # Only include products with at least a name or URL
-            if formatted_product['product_name'] or formatted_product['product_url']:
-                formatted_products.append(formatted_product)
+            if formatted_product['product_name'] or formatted_product['product_url']
+        ]
         
-        return {
+        extraction = {
             'success': result.get('success', False),
             'num_products': len(formatted_products),
             'products': formatted_products,
             'extraction_strategy': result.get('extraction_strategy', 'none'),
             'error': result.get('error'),
         }
+        
+        if cache_key is not None:
+            with _extraction_cache_lock:
+                _extraction_cache[cache_key] = {**extraction, 'products': list(formatted_products)}
+                if len(_extraction_cache) > EXTRACTION_CACHE_SIZE:
+                    _extraction_cache.popitem(last=False)
+        
+        return extraction
     except Exception as e:
-        logger.error(f"Error extracting products from {source_url}: {e}", exc_info=True)
+        logger.error(f"Error extracting products from {source_url}: {type(e).__name__}: {e}", exc_info=logger.isEnabledFor(logging.DEBUG))
         return {
             'success': False,
             'num_products': 0,
@@ -401,20 +657,27 @@ def save_products_to_supabase(products: List[Dict], platform_url: str, product_t
         db_records = []
         for product in products:
             try:
+                # Read each field once; the conversions below test and reuse them
+                get = product.get
+                original_price = get('original_price')
+                cost = get('cost')
+                rating = get('rating')
+                review_count = get('review_count')
+                
                 # Prepare data for Supabase table
                 db_record = {
                     'platform_url': platform_url,
-                    'product_name': product.get('product_name', ''),
-                    'product_url': product.get('product_url', ''),
-                    'product_image_url': product.get('image_url') or None,
-                    'original_price': str(product.get('original_price', '')) if product.get('original_price') else None,
-                    'current_price': float(product.get('cost')) if product.get('cost') else None,
+                    'product_name': get('product_name', ''),
+                    'product_url': get('product_url', ''),
+                    'product_image_url': get('image_url') or None,
+                    'original_price': str(original_price) if original_price else None,
+                    'current_price': float(cost) if cost else None,
                     'product_type_id': product_type_id,
-                    'rating': float(product.get('rating')) if product.get('rating') else None,
-                    'reviews': int(product.get('review_count')) if product.get('review_count') else None,
-                    'brand': product.get('brand') or None,
-                    'in_stock': 'Yes' if product.get('in_stock', True) else 'No',
-                    'description': product.get('description') or None,
+                    'rating': float(rating) if rating else None,
+                    'reviews': int(review_count) if review_count else None,
+                    'brand': get('brand') or None,
+                    'in_stock': 'Yes' if get('in_stock', True) else 'No',
+                    'description': get('description') or None,
                     'category_id': None,
                     'searched_product_id': None,
                 }
@@ -423,34 +686,33 @@ def save_products_to_supabase(products: List[Dict], platform_url: str, product_t
                 if db_record['product_name'] and db_record['product_url']:
                     db_records.append(db_record)
             except Exception as e:
-                logger.debug(f"Error preparing product record: {e}")
+                logger.debug("Error preparing product record: %s", e)
                 continue
         
         if not db_records:
             return 0
         
-        # Use batch insert with retry logic
+        # Use bulk insert with retry logic
+        # _parse_html caps a page at 100 products (max_items), so this is a single
+        # round-trip; chunking only matters if that cap is ever raised
         saved_count = 0
-        max_retries = 3
-        # Increase batch size for better performance (Supabase supports up to 1000 rows per insert)
-        batch_size = 100  # Insert in batches to avoid connection issues
+        max_retries = DB_MAX_RETRIES
         
-        for i in range(0, len(db_records), batch_size):
-            batch = db_records[i:i + batch_size]
+        for i in range(0, len(db_records), DB_INSERT_BATCH_SIZE):
+            batch = db_records[i:i + DB_INSERT_BATCH_SIZE]
             
             for attempt in range(max_retries):
                 try:
-                    # Batch insert with thread-safe operation
-                    with db_lock:
-                        result = supabase.table('r_product_data').insert(batch).execute()
+                    # Batch insert (the client is safe to share; db_semaphore bounds concurrency)
+                    result = product_table.insert(batch).execute()
                     
                     if result.data:
                         saved_count += len(result.data)
                         break  # Success, move to next batch
                     else:
                         if attempt < max_retries - 1:
-                            wait_time = 0.5 * (2 ** attempt)  # Exponential backoff
-                            logger.warning(f"Batch insert returned no data, retrying in {wait_time}s...")
+                            wait_time = _backoff_delay(0.5, attempt)  # Exponential backoff
+                            logger.warning(f"Batch insert returned no data, retrying in {wait_time:.1f}s...")
                             time.sleep(wait_time)
                         else:
                             logger.warning(f"Failed to save batch of {len(batch)} products after {max_retries} attempts")
@@ -462,8 +724,8 @@ def save_products_to_supabase(products: List[Dict], platform_url: str, product_t
                     # Check if it's a connection error
                     if 'RemoteProtocolError' in error_type or 'Server disconnected' in error_msg or 'Connection' in error_type:
                         if attempt < max_retries - 1:
-                            wait_time = 1.0 * (2 ** attempt)  # Longer wait for connection errors
-                            logger.warning(f"Connection error (attempt {attempt + 1}/{max_retries}): {error_type}. Retrying in {wait_time}s...")
+                            wait_time = _backoff_delay(1.0, attempt)  # Longer wait for connection errors
+                            logger.warning(f"Connection error (attempt {attempt + 1}/{max_retries}): {error_type}. Retrying in {wait_time:.1f}s...")
                             time.sleep(wait_time)
                             continue
                         else:
@@ -475,12 +737,12 @@ def save_products_to_supabase(products: List[Dict], platform_url: str, product_t
                         # Other errors - log and continue
                         logger.error(f"Error saving batch to Supabase: {error_type}: {error_msg}")
                         if attempt < max_retries - 1:
-                            time.sleep(0.5 * (2 ** attempt))
+                            time.sleep(_backoff_delay(0.5, attempt))
                         else:
                             break
         
         if saved_count > 0:
-            logger.debug(f"Successfully saved {saved_count}/{len(products)} products to Supabase")
+            logger.debug("Successfully saved %d/%d products to Supabase", saved_count, len(products))
         
         return saved_count
         
@@ -500,18 +762,17 @@ def _save_products_individually(db_records: List[Dict], platform_url: str, produ
     for db_record in db_records:
         db_semaphore.acquire()
         try:
-            for attempt in range(3):
+            for attempt in range(DB_MAX_RETRIES):
                 try:
-                    with db_lock:
-                        result = supabase.table('r_product_data').insert(db_record).execute()
+                    result = product_table.insert(db_record).execute()
                     if result.data:
                         saved_count += 1
                         break
                 except Exception as e:
-                    if attempt < 2:
-                        time.sleep(0.5 * (2 ** attempt))
+                    if attempt < DB_MAX_RETRIES - 1:
+                        time.sleep(_backoff_delay(0.5, attempt))
                     else:
-                        logger.debug(f"Failed to save individual product after retries: {type(e).__name__}")
+                        logger.debug("Failed to save individual product after retries: %s", type(e).__name__)
         finally:
             db_semaphore.release()
     
@@ -523,7 +784,8 @@ def update_url_status(
     success: bool,
     products_found: int = 0,
     products_saved: int = 0,
-    error_message: Optional[str] = None
+    error_message: Optional[str] = None,
+    retry_count: Optional[int] = None
 ):
     """
     Update the processing status of a URL in product_page_urls table.
@@ -535,6 +797,7 @@ def update_url_status(
         products_found: Number of products found
         products_saved: Number of products saved to database
         error_message: Error message if processing failed
+        retry_count: The record's retry_count as claimed; looked up if not given
     """
     if not supabase:
         logger.warning("Supabase client not initialized. Skipping status update.")
@@ -557,22 +820,24 @@ def update_url_status(
                 error_message = error_message[:997] + "..."
             update_data['error_message'] = error_message
             # Increment retry count on failure
-            try:
-                with db_lock:
-                    current_record = supabase.table('product_page_urls').select('retry_count').eq('id', url_id).execute()
-                if current_record.data:
-                    current_retry_count = current_record.data[0].get('retry_count', 0) or 0
-                    update_data['retry_count'] = current_retry_count + 1
-            except Exception as e:
-                logger.warning(f"Could not fetch current retry count: {e}")
-                update_data['retry_count'] = 1
+            if retry_count is not None:
+                # The claimed row is ours until this update, so its value is still current
+                update_data['retry_count'] = retry_count + 1
+            else:
+                try:
+                    current_record = url_table.select('retry_count').eq('id', url_id).execute()
+                    if current_record.data:
+                        current_retry_count = current_record.data[0].get('retry_count', 0) or 0
+                        update_data['retry_count'] = current_retry_count + 1
+                except Exception as e:
+                    logger.warning(f"Could not fetch current retry count: {e}")
+                    update_data['retry_count'] = 1
         
-        with db_lock:
-            supabase.table('product_page_urls').update(update_data).eq('id', url_id).execute()
-        logger.debug(f"Updated status for URL ID {url_id}: success={success}, products={products_found}")
+        url_table.update(update_data).eq('id', url_id).execute()
+        logger.debug("Updated status for URL ID %s: success=%s, products=%s", url_id, success, products_found)
         
     except Exception as e:
-        logger.error(f"Error updating URL status for ID {url_id}: {e}", exc_info=True)
+        logger.error(f"Error updating URL status for ID {url_id}: {type(e).__name__}: {e}", exc_info=logger.isEnabledFor(logging.DEBUG))
     finally:
         # Always release semaphore
         db_semaphore.release()
@@ -585,6 +850,19 @@ def process_batch(url_records: List[Dict[str, Any]]):
     Args:
         url_records: List of URL records with id, product_type_id, product_page_url
     """
+    extract_batch(fetch_batch_html(url_records))
+
+
+def fetch_batch_html(url_records: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    First stage of a batch: fetch the HTML of claimed URLs, once per distinct URL.
+    
+    Args:
+        url_records: List of URL records with id, product_type_id, product_page_url
+        
+    Yields:
+        Fetched chunks for extract_batch, as soon as each chunk's HTML arrives
+    """
     if not url_records:
         return
     
@@ -599,218 +877,328 @@ def process_batch(url_records: List[Dict[str, Any]]):
     logger.info(f"  ID Range: {min_id} to {max_id}")
     logger.info("=" * 60)
     
-    # Filter out Meesho URLs (temporary condition - to be removed later)
-    meesho_urls = []
-    non_meesho_records = []
-    
+    # Group records by URL so each distinct page is fetched once; several rows
+    # (e.g. different product types) can share a URL and all need a status update
+    url_to_records: Dict[str, List[Dict[str, Any]]] = {}
     for record in url_records:
-        url = record.get('product_page_url', '').lower()
-        if 'meesho' in url:
-            meesho_urls.append(record)
-        else:
-            non_meesho_records.append(record)
-    
-    if meesho_urls:
-        logger.info(f"⚠️  Skipping {len(meesho_urls)} Meesho URLs (temporary filter)")
-        for meesho_record in meesho_urls:
-            url_id = meesho_record['id']
-            url = meesho_record['product_page_url']
-            logger.info(f"  [ID {url_id}] Skipped Meesho URL: {url}")
-            # Mark as failed with skip reason
-            update_url_status(
-                url_id=url_id,
-                success=False,
-                error_message="Skipped: Meesho links temporarily excluded (filter will be removed later)"
-            )
+        url_to_records.setdefault(record['product_page_url'], []).append(record)
     
-    # Extract URLs for HTML fetching (only non-Meesho URLs)
-    urls = [record['product_page_url'] for record in non_meesho_records]
+    # Extract unique URLs for HTML fetching, in batch order
+    urls = list(url_to_records)
     
-    # Create mapping from URL to record
-    url_to_record = {record['product_page_url']: record for record in non_meesho_records}
+    logger.info(f"Processing {len(urls)} unique URLs")
+    logger.info(f"📤 Sending {len(urls)} URLs to URL-to-HTML API...")
+    logger.info(f"API: {URLTOHTML_URL}")
     
-    if not urls:
-        logger.info("No URLs to process after filtering (all were Meesho URLs)")
-        return
+    # Running totals for the API results summary; only counts and a few samples
+    # are kept, since each chunk's HTML is released once it has been extracted
+    total_count = 0
+    success_count = 0
+    failed_count = 0
+    by_method: Dict[str, int] = {}
+    successful_samples = []
+    failed_samples = []
+    start_time = time.perf_counter()
+    
+    # Fetch HTML from Railway service in concurrent chunks; each chunk can be
+    # extracted while the others are still being fetched
+    for html_results in fetch_html_in_chunks(urls):
+        logger.debug("📥 Received HTML responses for %d URLs", len(html_results))
+        total_count += len(html_results)
+        
+        for result in html_results:
+            method = result.get('method')
+            if method:
+                by_method[method] = by_method.get(method, 0) + 1
+            if result.get('status') == 'success':
+                success_count += 1
+                if len(successful_samples) < 5:
+                    successful_samples.append((result.get('url'), method or 'unknown', len(result.get('html') or '')))
+            elif result.get('status') == 'failed':
+                failed_count += 1
+                if len(failed_samples) < 5:
+                    failed_samples.append((result.get('url'), result.get('error') or 'Unknown error'))
+        
+        yield {
+            'url_records': url_records,
+            'url_to_records': url_to_records,
+            'html_results': html_results,
+            'min_id': min_id,
+            'max_id': max_id,
+        }
+    
+    logger.info("=" * 60)
+    logger.info("API RESULTS")
+    logger.info("=" * 60)
+    logger.info(f"Total URLs: {total_count}")
+    logger.info(f"Successful: {success_count}")
+    logger.info(f"Failed: {failed_count}")
+    logger.info(f"Success Rate: {success_count / total_count * 100 if total_count else 0:.2f}%")
+    logger.info(f"Total Time: {time.perf_counter() - start_time:.2f} seconds")
     
-    logger.info(f"Processing {len(urls)} non-Meesho URLs")
-    logger.info(f"📤 Sending all {len(urls)} URLs in a SINGLE batch request to URL-to-HTML API...")
-    
-    # Fetch HTML from Railway service - ALL URLs in ONE request
-    html_results = fetch_html_from_railway(urls)
-    
-    logger.info(f"📥 Received HTML responses for {len(html_results)} URLs")
-    logger.info(f"⚡ Now processing HTML contents in parallel using {EXTRACTION_WORKERS} workers...")
-    
-    # Filter successful results for parallel processing
-    successful_results = []
-    failed_results = []
-    
-    for html_result in html_results:
-        url = html_result.get('url', '')
-        status = html_result.get('status', '')
-        html = html_result.get('html', '')
-        
-        # Find corresponding record
-        record = url_to_record.get(url)
-        if not record:
-            logger.warning(f"No record found for URL: {url}")
-            continue
-        
-        # Check if HTML fetch was successful
-        is_success = status == 'success' and html and (isinstance(html, str) and len(html.strip()) > 0)
-        
-        if is_success:
-            successful_results.append({
-                'html_result': html_result,
-                'record': record
-            })
-        else:
-            failed_results.append({
-                'html_result': html_result,
-                'record': record
-            })
-    
-    # Process failed results immediately (no HTML to extract)
-    for item in failed_results:
-        html_result = item['html_result']
-        record = item['record']
-        url = html_result.get('url', '')
-        url_id = record['id']
-        error_msg = html_result.get('error', 'No HTML content received')
-        method = html_result.get('method', 'unknown')
-        
-        logger.warning(f"[ID {url_id}] Failed to fetch HTML for {url}: {error_msg} (Method: {method})")
+    # Print results by method
+    if by_method:
+        logger.info("Results by Method:")
+        for method, count in by_method.items():
+            logger.info(f"  {method}: {count}")
+    
+    # Show successful URLs
+    if success_count:
+        logger.info(f"Successful URLs ({success_count}):")
+        for url, method, html_size in successful_samples:  # Show first 5
+            logger.info(f"  ✓ {url}")
+            logger.info(f"    Method: {method}, Size: {html_size:,} bytes")
+        if success_count > 5:
+            logger.info(f"    ... and {success_count - 5} more successful")
+    
+    # Show failed URLs
+    if failed_count:
+        logger.info(f"Failed URLs ({failed_count}):")
+        for url, error in failed_samples:  # Show first 5
+            logger.info(f"  ✗ {url}")
+            logger.info(f"    Error: {error[:100]}")
+        if failed_count > 5:
+            logger.info(f"    ... and {failed_count - 5} more failed")
+    
+    logger.info("=" * 60)
+
+
+def process_record(url: str, extraction_result: Dict[str, Any], record: Dict[str, Any]) -> Dict[str, Any]:
+    """Save one record's products from an extraction result and update its status."""
+    url_id = record['id']
+    product_type_id = record['product_type_id']
+    
+    try:
+        products = extraction_result.get('products', [])
+        products_found = len(products)
+        
+        # Save products to database
+        products_saved = 0
+        if products:
+            products_saved = save_products_to_supabase(products, url, product_type_id)
+        
+        # Update URL status
+        success = extraction_result.get('success', False) and products_found > 0
+        error_message = extraction_result.get('error')
+        
+        update_url_status(
+            url_id=url_id,
+            success=success,
+            products_found=products_found,
+            products_saved=products_saved,
+            error_message=error_message,
+            retry_count=record.get('retry_count') or 0
+        )
+        
+        return {
+            'url_id': url_id,
+            'url': url,
+            'success': True,
+            'products_found': products_found,
+            'products_saved': products_saved,
+            'error': None
+        }
+        
+    except Exception as e:
+        logger.error(f"[ID {url_id}] Error processing {url}: {type(e).__name__}: {e}", exc_info=logger.isEnabledFor(logging.DEBUG))
         update_url_status(
             url_id=url_id,
             success=False,
-            error_message=error_msg
+            error_message=f"{type(e).__name__}: {str(e)}",
+            retry_count=record.get('retry_count') or 0
         )
+        return {
+            'url_id': url_id,
+            'url': url,
+            'success': False,
+            'products_found': 0,
+            'products_saved': 0,
+            'error': str(e)
+        }
+
+
+def process_single_url(item) -> List[Dict[str, Any]]:
+    """
+    Process a single URL: extract products once, then save them for each of its records.
+    
+    Args:
+        item: (url, html_result, records) for a page whose HTML was fetched
+        
+    Returns:
+        One process_record result per record
+    """
+    url, html_result, records = item
+    html = html_result['html']  # Only results with non-blank HTML are queued here
     
-    # Process successful results in parallel
-    if successful_results:
-        logger.info(f"Processing {len(successful_results)} URLs with HTML content using {EXTRACTION_WORKERS} parallel workers...")
-        start_time = time.time()
-        
-        def process_single_url(item):
-            """Process a single URL: extract products and save to database."""
-            html_result = item['html_result']
-            record = item['record']
-            url = html_result.get('url', '')
-            html = html_result.get('html', '')
-            method = html_result.get('method', 'unknown')
-            url_id = record['id']
-            product_type_id = record['product_type_id']
+    # product_type_id only tags the saved rows, so one extraction serves every record
+    try:
+        extraction_result = extract_products_from_html(html, url, records[0]['product_type_id'])
+    except Exception as e:
+        extraction_result = {'success': False, 'products': [], 'error': f"{type(e).__name__}: {str(e)}"}
+    
+    return [process_record(url, extraction_result, record) for record in records]
+
+
+def extract_batch(fetched_chunks: Iterable[Dict[str, Any]]):
+    """
+    Second stage of a batch: extract products from fetched HTML and save them.
+    
+    One extraction pool serves the whole batch: each chunk's pages are submitted
+    to it as soon as the chunk arrives, so a slow page only holds up its own
+    thread rather than every later chunk.
+    
+    Args:
+        fetched_chunks: Chunks yielded by fetch_batch_html, in arrival order
+    """
+    batch = None
+    html_result_count = 0
+    page_count = 0
+    record_total = 0
+    futures = []
+    start_time = time.perf_counter()
+    
+    logger.info(f"⚡ Processing HTML contents as chunks arrive, using {EXTRACTION_WORKERS} parallel workers...")
+    
+    with ThreadPoolExecutor(max_workers=EXTRACTION_WORKERS) as executor:
+        for fetched in fetched_chunks:
+            batch = fetched
+            url_to_records = fetched['url_to_records']
+            html_results = fetched['html_results']
+            html_result_count += len(html_results)
             
-            try:
-                # Extract products from HTML
-                extraction_result = extract_products_from_html(html, url, product_type_id)
-                
-                products = extraction_result.get('products', [])
-                products_found = len(products)
+            # Filter successful results for parallel processing
+            successful_results = []
+            failed_results = []
+            
+            for html_result in html_results:
+                get = html_result.get
+                url = get('url', '')
+                status = get('status', '')
+                html = get('html', '')
                 
-                # Save products to database
-                products_saved = 0
-                if products:
-                    products_saved = save_products_to_supabase(products, url, product_type_id)
+                # Find corresponding records
+                records = url_to_records.get(url)
+                if not records:
+                    logger.warning(f"No record found for URL: {url}")
+                    continue
                 
-                # Update URL status
-                success = extraction_result.get('success', False) and products_found > 0
-                error_message = extraction_result.get('error')
+                # Check if HTML fetch was successful (isspace() avoids copying the page like strip() would)
+                is_success = status == 'success' and isinstance(html, str) and html and not html.isspace()
                 
-                update_url_status(
-                    url_id=url_id,
-                    success=success,
-                    products_found=products_found,
-                    products_saved=products_saved,
-                    error_message=error_message
-                )
-                
-                return {
-                    'url_id': url_id,
-                    'url': url,
-                    'success': True,
-                    'products_found': products_found,
-                    'products_saved': products_saved,
-                    'error': None
-                }
+                # Pages to extract stay grouped as (url, html_result, records), so a page shared
+                # by several records is parsed once; failures are reported per record
+                if is_success:
+                    successful_results.append((url, html_result, records))
+                else:
+                    failed_results.extend([(url, html_result, record) for record in records])
+            
+            # Process failed results immediately (no HTML to extract)
+            for url, html_result, record in failed_results:
+                url_id = record['id']
+                error_msg = html_result.get('error', 'No HTML content received')
+                method = html_result.get('method', 'unknown')
                 
-            except Exception as e:
-                logger.error(f"[ID {url_id}] Error processing {url}: {e}", exc_info=True)
+                logger.warning(f"[ID {url_id}] Failed to fetch HTML for {url}: {error_msg} (Method: {method})")
                 update_url_status(
                     url_id=url_id,
                     success=False,
-                    error_message=f"{type(e).__name__}: {str(e)}"
+                    error_message=error_msg,
+                    retry_count=record.get('retry_count') or 0
                 )
-                return {
-                    'url_id': url_id,
-                    'url': url,
-                    'success': False,
-                    'products_found': 0,
-                    'products_saved': 0,
-                    'error': str(e)
-                }
+            
+            # Queue this chunk's pages behind the earlier chunks' in the shared pool
+            if successful_results:
+                chunk_records = sum(len(records) for _, _, records in successful_results)
+                logger.info(f"Queued {len(successful_results)} URLs with HTML content ({chunk_records} records) for extraction")
+                page_count += len(successful_results)
+                record_total += chunk_records
+                futures.extend(executor.submit(process_single_url, item) for item in successful_results)
         
-        # Process in parallel using ThreadPoolExecutor
+        # Collect results once every chunk has been queued; process_single_url
+        # handles its own errors, so result() only raises on a bug
         processed_count = 0
-        with ThreadPoolExecutor(max_workers=EXTRACTION_WORKERS) as executor:
-            # Submit all tasks
-            future_to_item = {
-                executor.submit(process_single_url, item): item
-                for item in successful_results
-            }
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                logger.error(f"Error in parallel processing: {e}", exc_info=True)
+                continue
             
-            # Collect results as they complete
-            for future in as_completed(future_to_item):
-                item = future_to_item[future]
-                try:
-                    result = future.result()
-                    processed_count += 1
-                    
-                    if result['success']:
-                        logger.info(f"[ID {result['url_id']}] Processed {result['url']}: "
-                                  f"{result['products_found']} products found, {result['products_saved']} saved")
-                    else:
-                        logger.warning(f"[ID {result['url_id']}] Failed: {result['error']}")
-                        
-                except Exception as e:
-                    logger.error(f"Error in parallel processing: {e}", exc_info=True)
-        
-        elapsed_time = time.time() - start_time
-        logger.info(f"✓ Parallel extraction complete: {processed_count}/{len(successful_results)} URLs processed in {elapsed_time:.2f}s "
-                  f"(avg: {elapsed_time/len(successful_results):.2f}s per URL)")
+            for result in results:
+                processed_count += 1
+                
+                if result['success']:
+                    logger.info(f"[ID {result['url_id']}] Processed {result['url']}: "
+                              f"{result['products_found']} products found, {result['products_saved']} saved")
+                else:
+                    logger.warning(f"[ID {result['url_id']}] Failed: {result['error']}")
+    
+    if batch is None:
+        return
+    
+    if page_count:
+        elapsed_time = time.perf_counter() - start_time
+        logger.info(f"✓ Parallel extraction complete: {processed_count}/{record_total} records processed in {elapsed_time:.2f}s "
+                  f"(avg: {elapsed_time/page_count:.2f}s per URL)")
     
     # Log batch completion summary
     logger.info("=" * 60)
     logger.info(f"BATCH PROCESSING COMPLETE")
-    logger.info(f"  Total URLs in batch: {len(url_records)}")
-    logger.info(f"  HTML results received: {len(html_results)}")
-    logger.info(f"  ID Range processed: {min_id} to {max_id}")
+    logger.info(f"  Total URLs in batch: {len(batch['url_records'])}")
+    logger.info(f"  HTML results received: {html_result_count}")
+    logger.info(f"  ID Range processed: {batch['min_id']} to {batch['max_id']}")
     logger.info("=" * 60)
 
 
-def run_worker():
+# IDs of URLs the fetcher thread has claimed but not yet handed to extraction.
+# They are put back to 'pending' on shutdown instead of being left 'processing'.
+_unextracted_claims: set = set()
+_unextracted_claims_lock = Lock()
+
+
+def _release_claims(url_ids) -> None:
     """
-    Main worker loop: continuously fetch and process URLs.
+    Put URLs this worker claimed but won't process back to 'pending'.
+    
+    Only rows still 'processing' under this worker's claim are reset, so a row
+    that was finished or re-claimed in the meantime is left alone.
     """
-    logger.info("=" * 60)
-    logger.info(f"Product Extraction Worker Running")
-    logger.info(f"Worker ID: {WORKER_ID}")
-    logger.info(f"Batch size: {BATCH_SIZE}")
-    logger.info(f"Poll interval: {POLL_INTERVAL}s")
-    logger.info(f"Parallel extraction workers: {EXTRACTION_WORKERS} (from MAX_WORKERS or EXTRACTION_WORKERS env var)")
-    logger.info(f"Max concurrent DB operations: {MAX_CONCURRENT_DB_OPS} (throttled to prevent connection errors)")
-    if EXTRACTION_WORKERS >= 30:
-        logger.info(f"⚡ High-performance mode: {EXTRACTION_WORKERS} workers (Railway Pro recommended)")
-    logger.info(f"URL-to-HTML service: {URLTOHTML_URL}")
-    logger.info(f"Using public HTTPS API endpoint")
-    logger.info(f"Supabase URL: {SUPABASE_URL[:50]}..." if SUPABASE_URL else "Not set")
-    logger.info("=" * 60)
+    url_ids = list(url_ids)
+    if not url_ids:
+        return
+    try:
+        url_table.update({
+            'processing_status': 'pending',
+            'claimed_by': None,
+            'claimed_at': None
+        }).in_('id', url_ids).eq('processing_status', 'processing').eq('claimed_by', WORKER_ID).execute()
+        logger.info(f"Released {len(url_ids)} claimed URLs back to pending")
+    except Exception as e:
+        logger.error(f"Failed to release {len(url_ids)} claimed URLs (IDs: {min(url_ids)}-{max(url_ids)}): {e}")
+
+
+def _release_unextracted_claims() -> None:
+    """Release every claim the fetcher thread hasn't handed to extraction yet."""
+    with _unextracted_claims_lock:
+        url_ids = list(_unextracted_claims)
+        _unextracted_claims.clear()
+    _release_claims(url_ids)
+
+
+def _fetch_loop(fetched_batches: Queue, stop: Event):
+    """
+    Fetcher thread: claim pending URLs and fetch their HTML, one batch ahead.
     
+    Each batch is handed to the extraction loop through fetched_batches one chunk
+    at a time, as the chunks arrive, followed by a None end-of-batch marker. The
+    next batch is only claimed once the previous one has been taken, so at most
+    one fetched chunk waits while the extraction loop is busy. Stops claiming
+    once stop is set.
+    """
     consecutive_empty_batches = 0
     max_empty_batches = 10  # Log warning after 10 empty batches
     
-    while True:
+    while not stop.is_set():
         try:
             # Fetch pending URLs
             url_records = fetch_pending_urls(BATCH_SIZE)
@@ -820,25 +1208,141 @@ def run_worker():
                 if consecutive_empty_batches >= max_empty_batches:
                     logger.info(f"No pending URLs found (checked {consecutive_empty_batches} times). Waiting {POLL_INTERVAL}s...")
                     consecutive_empty_batches = 0  # Reset counter
-                time.sleep(POLL_INTERVAL)
+                stop.wait(POLL_INTERVAL)
                 continue
             
             # Reset empty batch counter
             consecutive_empty_batches = 0
             
-            # Process the batch
-            process_batch(url_records)
+            batch_ids = [record['id'] for record in url_records]
+            with _unextracted_claims_lock:
+                _unextracted_claims.update(batch_ids)
+            if stop.is_set():
+                # Shutdown began while claiming; the main thread may already have released
+                _release_unextracted_claims()
+                break
+            
+            # Hand over each chunk as it arrives, so extraction starts while the
+            # rest of the batch is still being fetched
+            try:
+                for fetched in fetch_batch_html(url_records):
+                    fetched_batches.put(fetched)
+            finally:
+                fetched_batches.put(None)  # End of batch, even if fetching failed part-way
+            # Block until the extraction loop has taken the whole batch before claiming more
+            fetched_batches.join()
             
-            # Small delay between batches
-            time.sleep(1)
+            # Rows whose URL came back in no chunk were never handed over either
+            with _unextracted_claims_lock:
+                _unextracted_claims.difference_update(batch_ids)
             
-        except KeyboardInterrupt:
-            logger.info("Worker stopped by user")
-            break
         except Exception as e:
-            logger.error(f"Error in worker loop: {e}", exc_info=True)
+            logger.error(f"Error in fetch loop: {e}", exc_info=True)
             logger.info(f"Waiting {POLL_INTERVAL}s before retrying...")
-            time.sleep(POLL_INTERVAL)
+            stop.wait(POLL_INTERVAL)
+
+
+def _chunk_record_ids(fetched: Dict[str, Any]) -> List[int]:
+    """IDs of the records whose URLs came back in a fetched chunk."""
+    url_to_records = fetched['url_to_records']
+    return [
+        record['id']
+        for html_result in fetched['html_results']
+        for record in url_to_records.get(html_result.get('url', ''), ())
+    ]
+
+
+def _batch_chunks(fetched_batches: Queue) -> Iterator[Dict[str, Any]]:
+    """Yield one batch's fetched chunks from the fetcher thread, up to its end-of-batch marker."""
+    while True:
+        fetched = fetched_batches.get()
+        fetched_batches.task_done()  # Lets the fetcher claim the next batch right away
+        if fetched is None:
+            return
+        # From here on these rows are extraction's to finish, not the fetcher's to release
+        with _unextracted_claims_lock:
+            _unextracted_claims.difference_update(_chunk_record_ids(fetched))
+        yield fetched
+
+
+def _extract_fetched_batch(fetched_batches: Queue) -> None:
+    """
+    Extract the next batch the fetcher thread hands over.
+    
+    If extraction fails part-way, the rest of the batch is still taken off the
+    queue, up to its end-of-batch marker, so the next call starts on the next
+    batch instead of this one's leftover chunks. Rows in those leftover chunks
+    are put back to 'pending'.
+    """
+    chunks = _batch_chunks(fetched_batches)
+    try:
+        extract_batch(chunks)
+    except Exception:
+        skipped_ids = [url_id for fetched in chunks for url_id in _chunk_record_ids(fetched)]
+        if skipped_ids:
+            logger.warning(f"Batch extraction failed; releasing {len(skipped_ids)} URLs it didn't reach")
+            _release_claims(skipped_ids)
+        raise
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    """SIGTERM handler: stop the worker the same way Ctrl+C does."""
+    logger.info(f"Received signal {signum}, shutting down...")
+    raise KeyboardInterrupt
+
+
+def run_worker():
+    """
+    Main worker loop: continuously fetch and process URLs.
+    """
+    logger.info("=" * 60)
+    logger.info(f"Product Extraction Worker Running")
+    logger.info(f"Worker ID: {WORKER_ID}")
+    logger.info(f"Batch size: {BATCH_SIZE}")
+    logger.info(f"Poll interval: {POLL_INTERVAL}s")
+    logger.info(f"Excluded URL keywords: {', '.join(EXCLUDED_URL_KEYWORDS) or 'none'}")
+    logger.info(f"Parallel extraction workers: {EXTRACTION_WORKERS} (from MAX_WORKERS or EXTRACTION_WORKERS env var)")
+    logger.info(f"Max concurrent DB operations: {MAX_CONCURRENT_DB_OPS} (throttled to prevent connection errors)")
+    if EXTRACTION_WORKERS >= 30:
+        logger.info(f"⚡ High-performance mode: {EXTRACTION_WORKERS} workers (Railway Pro recommended)")
+    logger.info(f"Parse processes: {PARSE_PROCESSES or 'disabled (parsing in extraction threads)'}")
+    logger.info(f"URL-to-HTML service: {URLTOHTML_URL}")
+    logger.info(f"URL-to-HTML chunks: {FETCH_CHUNK_SIZE or 'disabled'} URLs per request, {FETCH_CONCURRENCY} concurrent")
+    logger.info(f"Using public HTTPS API endpoint")
+    logger.info(f"Supabase URL: {SUPABASE_URL[:50]}..." if SUPABASE_URL else "Not set")
+    logger.info("=" * 60)
+    
+    # Spawn parse processes now, while this is still the only thread
+    start_parse_pool()
+    
+    # Railway and Docker stop containers with SIGTERM; shut down as for Ctrl+C
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    
+    # Fetching (network-bound) runs in its own thread so the next batch's HTML is
+    # downloaded while this thread extracts the current one
+    fetched_batches: Queue = Queue(maxsize=1)
+    stop_fetching = Event()
+    Thread(target=_fetch_loop, args=(fetched_batches, stop_fetching), name='batch-fetcher', daemon=True).start()
+    
+    try:
+        while True:
+            try:
+                # Process the batch, extracting each chunk as the fetcher hands it over
+                _extract_fetched_batch(fetched_batches)
+                
+            except KeyboardInterrupt:
+                logger.info("Worker stopped by user")
+                break
+            except Exception as e:
+                logger.error(f"Error in worker loop: {e}", exc_info=True)
+                logger.info(f"Waiting {POLL_INTERVAL}s before retrying...")
+                time.sleep(POLL_INTERVAL)
+    finally:
+        # The fetcher has usually claimed the next batch already; hand those rows
+        # back rather than leave them 'processing' when this process exits
+        stop_fetching.set()
+        _release_unextracted_claims()
+        stop_parse_pool()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+"""
+Regression checks for HTMLProductParser extraction output.
+
+Run from the repository root with: python -m unittest discover tests
+"""
+
+import json
+import unittest
+
+from bs4 import BeautifulSoup
+
+from html_parser import HTMLProductParser
+
+
+# Amazon-style search results: each product card is itself a
+# [data-component-type="s-search-result"] element, with no list wrapper around them
+AMAZON_RESULTS_HTML = '<html><body><div class="s-main-slot">' + ''.join(
+    f'''<div data-component-type="s-search-result" data-asin="B0{i}">
+    <h2><a class="a-link-normal" href="/Widget-{i}/dp/B00000000{i}"><span>Acme Widget Model {i}</span></a></h2>
+    <span class="a-price"><span class="a-offscreen">₹{i}99</span></span>
+    <img class="s-image" src="https://m.media-amazon.com/images/I/widget{i}.jpg">
+    </div>'''
+    for i in range(1, 4)
+) + '</div></body></html>'
+
+
+class CardLevelContainerTest(unittest.TestCase):
+    """Container selectors that match the cards themselves are extracted as cards."""
+
+    def test_amazon_results_use_dom_strategy(self):
+        result = HTMLProductParser().parse_html(AMAZON_RESULTS_HTML, 'https://www.amazon.in/s?k=widget')
+
+        # Before card-level containers were recognised this page fell through to 'fallback'
+        self.assertTrue(result['success'])
+        self.assertEqual(result['extraction_strategy'], 'dom_css')
+        self.assertEqual(result['num_products'], 3)
+
+        first = result['products'][0]
+        self.assertEqual(first['title'], 'Acme Widget Model 1')
+        self.assertEqual(first['product_url'], 'https://www.amazon.in/Widget-1/dp/B000000001')
+        self.assertEqual(first['image_url'], 'https://m.media-amazon.com/images/I/widget1.jpg')
+        self.assertEqual(first['price'], 199.0)
+        self.assertEqual(first['currency'], 'INR')
+        # Fields only the card extraction fills in
+        self.assertEqual(first['price_raw'], '₹199')
+        self.assertIs(first['in_stock'], True)
+        self.assertEqual([p['title'] for p in result['products']],
+                         [f'Acme Widget Model {i}' for i in range(1, 4)])
+
+
+# Nested JSON-LD: an ItemList inside a @graph node's mainEntity, a list-valued @type
+# with a related Product nested under it, and a second top-level ItemList
+NESTED_JSONLD = {
+    '@context': 'https://schema.org',
+    '@graph': [
+        {'@type': 'WebPage', 'name': 'Widgets', 'mainEntity': {
+            '@type': 'ItemList',
+            'itemListElement': [
+                {'@type': 'ListItem', 'position': 1, 'item': {
+                    '@type': 'Product', 'name': 'Alpha Widget', 'url': 'https://shop.example/p/alpha',
+                    'offers': {'@type': 'Offer', 'price': '10.00', 'priceCurrency': 'USD'}}},
+                {'@type': 'ListItem', 'position': 2, 'item': {
+                    '@type': ['Product', 'IndividualProduct'], 'name': 'Beta Widget', 'url': 'https://shop.example/p/beta',
+                    'offers': {'@type': 'Offer', 'price': '20.00', 'priceCurrency': 'USD'}}},
+            ]}},
+        {'@type': ['Product', 'Thing'], 'name': 'Gamma Widget', 'url': 'https://shop.example/p/gamma',
+         'offers': {'@type': 'Offer', 'price': '30.00', 'priceCurrency': 'USD'},
+         'isRelatedTo': [{'@type': 'Product', 'name': 'Delta Widget', 'url': 'https://shop.example/p/delta',
+                          'offers': {'@type': 'Offer', 'price': '40.00', 'priceCurrency': 'USD'}}]},
+        {'@type': 'ItemList', 'itemListElement': [
+            {'@type': 'ListItem', 'position': 1, 'item': {
+                '@type': 'Product', 'name': 'Epsilon Widget', 'url': 'https://shop.example/p/epsilon'}}]},
+    ],
+}
+
+
+class JsonLdTraversalTest(unittest.TestCase):
+    """The JSON-LD walk visits nodes in the same depth-first order as the original recursion."""
+
+    def test_walk_order(self):
+        products = HTMLProductParser()._find_products_in_jsonld(NESTED_JSONLD, 'https://shop.example/widgets')
+
+        # ItemList entries are parsed from the list and again when their item is visited;
+        # duplicates are only removed later, by parse_html
+        self.assertEqual([p['title'] for p in products], [
+            'Alpha Widget', 'Alpha Widget', 'Beta Widget', 'Beta Widget', 'Alpha Widget', 'Beta Widget',
+            'Gamma Widget', 'Delta Widget', 'Epsilon Widget', 'Epsilon Widget', 'Epsilon Widget',
+        ])
+
+    def test_parse_html_order(self):
+        html = ('<html><head><script type="application/ld+json">' + json.dumps(NESTED_JSONLD)
+                + '</script></head><body></body></html>')
+
+        result = HTMLProductParser().parse_html(html, 'https://shop.example/widgets')
+
+        self.assertEqual(result['extraction_strategy'], 'jsonld')
+        self.assertEqual([(p['title'], p.get('price')) for p in result['products']], [
+            ('Alpha Widget', 10.0), ('Beta Widget', 20.0), ('Gamma Widget', 30.0),
+            ('Delta Widget', 40.0), ('Epsilon Widget', None),
+        ])
+
+
+# Six product cards plus an unrelated script holding a two-item "products" array
+CARDS_WITH_SCRIPT_HTML = (
+    '<html><head><script>var s = {"products": [{"name": "Script Item One", "url": "/product/script-1"}, '
+    '{"name": "Script Item Two", "url": "/product/script-2"}]};</script></head><body><div class="grid">'
+    + ''.join(
+        f'<div class="product-card"><a href="/product/widget-{i}"><img src="https://cdn.shop.example/w{i}.jpg">'
+        f'<h3>Widget Number {i}</h3></a><span class="price">Rs. {i}99</span></div>'
+        for i in range(1, 7)
+    )
+    + '</div></body></html>'
+)
+
+# A "products" array whose items hold nested objects, so only the array itself parses
+NESTED_ARRAY_HTML = (
+    '<html><head><script>var catalogue = {"products": [' + ', '.join(
+        f'{{"name": "Nested Item {i}", "url": "/product/nested-{i}", "price": {{"value": {i}9, "currency": "USD"}}}}'
+        for i in range(1, 4)
+    ) + ']};</script></head><body></body></html>'
+)
+
+
+class InlineScriptArrayTest(unittest.TestCase):
+    """Inline "products"/"items" arrays are parsed whole, without double-counting their items."""
+
+    def test_array_items_not_counted_twice(self):
+        result = HTMLProductParser().parse_html(CARDS_WITH_SCRIPT_HTML, 'https://shop.example/c/widgets')
+
+        # Both the flat-object scan and the array find the two script items; counted
+        # twice, they were enough for inline_scripts to win over the cards
+        self.assertEqual(result['extraction_strategy'], 'heuristics')
+        self.assertEqual([p['title'] for p in result['products']],
+                         [f'Widget Number {i}' for i in range(1, 7)])
+
+    def test_nested_array_items(self):
+        result = HTMLProductParser().parse_html(NESTED_ARRAY_HTML, 'https://shop.example/c/widgets')
+
+        self.assertEqual(result['extraction_strategy'], 'inline_scripts')
+        self.assertEqual([(p['title'], p['product_url']) for p in result['products']], [
+            (f'Nested Item {i}', f'https://shop.example/product/nested-{i}') for i in range(1, 4)
+        ])
+
+    def test_inline_scripts_dedupe(self):
+        products = HTMLProductParser()._extract_from_inline_scripts(
+            BeautifulSoup(CARDS_WITH_SCRIPT_HTML, 'html.parser'), 'https://shop.example/c/widgets', 100)
+
+        self.assertEqual([p['title'] for p in products], ['Script Item One', 'Script Item Two'])
+
+
+if __name__ == '__main__':
+    unittest.main()
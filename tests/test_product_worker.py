@@ -0,0 +1,515 @@
+"""
+Regression checks for product_worker fetching, claiming and extraction.
+
+Run from the repository root with: python -m unittest discover tests
+"""
+
+import logging
+import os
+import queue
+import threading
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from http.client import RemoteDisconnected
+from unittest import mock
+
+import orjson
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+# product_worker builds its Supabase client at import; no request is made until a query runs
+os.environ.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'test-key')
+
+import product_worker
+
+# The worker logs every request and retry at INFO; keep test output readable
+product_worker.logger.setLevel(logging.CRITICAL)
+
+
+def make_response(status_code: int, payload: dict, headers: dict = None) -> requests.Response:
+    """Build a requests.Response carrying a JSON body."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = orjson.dumps(payload)
+    response.headers.update(headers or {})
+    return response
+
+
+class FetchRetryPolicyTest(unittest.TestCase):
+    """fetch_html_from_railway: which responses are retried, and for how long it waits."""
+
+    URLS = ['https://shop.example/a', 'https://shop.example/b']
+    OK = {'summary': {'total': 2}, 'results': [
+        {'url': url, 'status': 'success', 'html': '<html></html>'} for url in URLS
+    ]}
+
+    def setUp(self):
+        post = mock.patch.object(product_worker.session, 'post')
+        sleep = mock.patch.object(product_worker.time, 'sleep')
+        self.post = post.start()
+        self.sleep = sleep.start()
+        self.addCleanup(post.stop)
+        self.addCleanup(sleep.stop)
+
+    def test_client_error_is_not_retried(self):
+        self.post.return_value = make_response(404, {'error': 'Not found'})
+
+        results = product_worker.fetch_html_from_railway(self.URLS)
+
+        self.assertEqual(self.post.call_count, 1)
+        self.sleep.assert_not_called()
+        self.assertEqual([r['url'] for r in results], self.URLS)
+        self.assertTrue(all(r['status'] == 'failed' and r['error'] == 'Not found' for r in results))
+
+    def test_retry_after_is_honoured(self):
+        self.post.side_effect = [
+            make_response(503, {'error': 'busy'}, {'Retry-After': '7'}),
+            make_response(200, self.OK),
+        ]
+
+        results = product_worker.fetch_html_from_railway(self.URLS)
+
+        self.assertEqual(self.post.call_count, 2)
+        self.sleep.assert_called_once_with(7.0)
+        self.assertEqual(results, self.OK['results'])
+
+    def test_retry_after_is_capped(self):
+        self.post.side_effect = [
+            make_response(429, {'error': 'slow down'}, {'Retry-After': '86400'}),
+            make_response(200, self.OK),
+        ]
+
+        product_worker.fetch_html_from_railway(self.URLS)
+
+        self.sleep.assert_called_once_with(product_worker.MAX_RETRY_AFTER)
+
+    def test_non_finite_retry_after_falls_back_to_backoff(self):
+        self.post.side_effect = [
+            make_response(503, {'error': 'busy'}, {'Retry-After': 'nan'}),
+            make_response(200, self.OK),
+        ]
+
+        with mock.patch.object(product_worker, '_backoff_delay', return_value=1.5) as backoff:
+            results = product_worker.fetch_html_from_railway(self.URLS)
+
+        backoff.assert_called_once_with(product_worker.RETRY_DELAY, 0)
+        self.sleep.assert_called_once_with(1.5)
+        self.assertEqual(results, self.OK['results'])
+
+    def test_refused_connection_retries_after_connect_delay(self):
+        refused = NewConnectionError(None, 'Failed to establish a new connection: [Errno 111] Connection refused')
+        self.post.side_effect = [
+            requests.exceptions.ConnectionError(MaxRetryError(None, '/api/v1/fetch-batch', refused)),
+            make_response(200, self.OK),
+        ]
+
+        with mock.patch.object(product_worker, '_backoff_delay', return_value=0.5) as backoff:
+            product_worker.fetch_html_from_railway(self.URLS)
+
+        backoff.assert_called_once_with(product_worker.CONNECT_RETRY_DELAY, 0)
+
+    def test_aborted_connection_retries_after_full_delay(self):
+        # The request was sent before the connection dropped, so the service may still be on it
+        aborted = ProtocolError('Connection aborted.', RemoteDisconnected('Remote end closed connection without response'))
+        self.post.side_effect = [
+            requests.exceptions.ConnectionError(aborted),
+            make_response(200, self.OK),
+        ]
+
+        with mock.patch.object(product_worker, '_backoff_delay', return_value=12.0) as backoff:
+            product_worker.fetch_html_from_railway(self.URLS)
+
+        backoff.assert_called_once_with(product_worker.RETRY_DELAY, 0)
+        self.sleep.assert_called_once_with(12.0)
+
+
+class ExtractionCacheTest(unittest.TestCase):
+    """extract_products_from_html memoizes parses by (HTML digest, URL) in a bounded LRU."""
+
+    def setUp(self):
+        product_worker._extraction_cache.clear()
+        self.addCleanup(product_worker._extraction_cache.clear)
+        cache_size = mock.patch.object(product_worker, 'EXTRACTION_CACHE_SIZE', 2)
+        parse = mock.patch.object(product_worker, '_parse_html', side_effect=self.fake_parse)
+        cache_size.start()
+        self.parse = parse.start()
+        self.addCleanup(cache_size.stop)
+        self.addCleanup(parse.stop)
+
+    @staticmethod
+    def fake_parse(html_content, source_url):
+        return {'success': True, 'extraction_strategy': 'fake', 'products': [
+            {'title': f'{html_content} item', 'product_url': f'{source_url}/item'},
+        ]}
+
+    def extract(self, html_content, source_url='https://shop.example/list'):
+        return product_worker.extract_products_from_html(html_content, source_url, 1)
+
+    def test_identical_page_is_parsed_once(self):
+        first = self.extract('<p>a</p>')
+        second = self.extract('<p>a</p>')
+
+        self.assertEqual(self.parse.call_count, 1)
+        self.assertEqual(second, first)
+        # Same HTML under another URL resolves links differently, so it is a separate entry
+        self.extract('<p>a</p>', 'https://other.example/list')
+        self.assertEqual(self.parse.call_count, 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.extract('<p>a</p>')
+        self.extract('<p>b</p>')
+        self.extract('<p>a</p>')  # Hit: 'a' becomes the most recently used
+        self.extract('<p>c</p>')  # Over EXTRACTION_CACHE_SIZE: evicts 'b'
+        self.assertEqual(self.parse.call_count, 3)
+
+        self.extract('<p>a</p>')
+        self.assertEqual(self.parse.call_count, 3)
+        self.extract('<p>b</p>')
+        self.assertEqual(self.parse.call_count, 4)
+        self.assertEqual(len(product_worker._extraction_cache), 2)
+
+    def test_changing_returned_list_does_not_touch_cache(self):
+        first = self.extract('<p>a</p>')
+        first['products'].clear()
+        second = self.extract('<p>a</p>')
+        second['products'].append({'product_name': 'injected'})
+
+        third = self.extract('<p>a</p>')
+
+        self.assertEqual(self.parse.call_count, 1)
+        self.assertEqual([p['product_name'] for p in third['products']], ['<p>a</p> item'])
+        self.assertEqual(third['num_products'], 1)
+
+
+class ParsePoolFallbackTest(unittest.TestCase):
+    """_parse_html falls back to in-thread parsing once the parse process pool breaks."""
+
+    def test_broken_pool_is_shut_down_and_parsing_continues(self):
+        pool = mock.Mock()
+        pool.submit.return_value.result.side_effect = BrokenProcessPool('a parse process died')
+        parser = mock.Mock()
+        parser.parse_html.return_value = {'success': True, 'products': []}
+
+        with mock.patch.object(product_worker, '_parse_pool', pool), \
+                mock.patch.object(product_worker, '_get_parser', return_value=parser):
+            result = product_worker._parse_html('<html></html>', 'https://shop.example/list')
+            pool_after = product_worker._parse_pool
+
+        self.assertEqual(result, {'success': True, 'products': []})
+        parser.parse_html.assert_called_once_with('<html></html>', 'https://shop.example/list', max_items=100)
+        self.assertIsNone(pool_after)
+        pool.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+
+
+class SharedUrlBatchTest(unittest.TestCase):
+    """Records sharing a URL are fetched and parsed once, but each is saved and updated."""
+
+    SHARED_URL = 'https://shop.example/list'
+    RECORDS = [
+        {'id': 1, 'product_type_id': 10, 'product_page_url': SHARED_URL, 'retry_count': 0},
+        {'id': 2, 'product_type_id': 20, 'product_page_url': SHARED_URL, 'retry_count': 1},
+    ]
+
+    def test_shared_page_is_fetched_and_parsed_once(self):
+        fetched = {'url': self.SHARED_URL, 'status': 'success', 'html': '<html>list</html>'}
+        parsed = {'success': True, 'products': [
+            {'title': 'Widget', 'product_url': 'https://shop.example/p/1'},
+        ]}
+        with mock.patch.object(product_worker, 'EXTRACTION_CACHE_SIZE', 0), \
+                mock.patch.object(product_worker, 'fetch_html_from_railway', return_value=[fetched]) as fetch, \
+                mock.patch.object(product_worker, '_parse_html', return_value=parsed) as parse, \
+                mock.patch.object(product_worker, 'save_products_to_supabase', return_value=1) as save, \
+                mock.patch.object(product_worker, 'update_url_status') as update:
+            product_worker.process_batch(self.RECORDS)
+
+        fetch.assert_called_once_with([self.SHARED_URL])
+        parse.assert_called_once_with('<html>list</html>', self.SHARED_URL)
+        self.assertEqual(sorted(call.args[2] for call in save.call_args_list), [10, 20])
+        updates = sorted((call.kwargs['url_id'], call.kwargs['success'], call.kwargs['retry_count'])
+                         for call in update.call_args_list)
+        self.assertEqual(updates, [(1, True, 0), (2, True, 1)])
+
+
+class FetchSummaryTest(unittest.TestCase):
+    """A batch fetched in several chunks logs one combined API results summary."""
+
+    RECORDS = [
+        {'id': i, 'product_type_id': 1, 'product_page_url': f'https://shop.example/{i}', 'retry_count': 0}
+        for i in range(1, 6)
+    ]
+
+    @staticmethod
+    def fake_fetch(urls):
+        return [
+            {'url': url, 'status': 'failed', 'error': 'HTTP 404'} if url.endswith('/3')
+            else {'url': url, 'status': 'success', 'html': '<html></html>', 'method': 'http'}
+            for url in urls
+        ]
+
+    def test_summary_is_logged_once_per_batch(self):
+        with mock.patch.object(product_worker, 'FETCH_CHUNK_SIZE', 2), \
+                mock.patch.object(product_worker, 'fetch_html_from_railway', side_effect=self.fake_fetch) as fetch, \
+                self.assertLogs(product_worker.logger, logging.DEBUG) as logs:
+            chunks = list(product_worker.fetch_batch_html(self.RECORDS))
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(fetch.call_count, 3)
+        messages = [record.getMessage() for record in logs.records]
+        self.assertEqual(messages.count('API RESULTS'), 1)
+        for line in ('Total URLs: 5', 'Successful: 4', 'Failed: 1', 'Success Rate: 80.00%', '  http: 4'):
+            self.assertIn(line, messages)
+        # Each chunk only gets a debug line of its own
+        received = [record for record in logs.records if record.getMessage().startswith('📥')]
+        self.assertEqual([record.levelno for record in received], [logging.DEBUG] * 3)
+
+
+class FakeQuery:
+    """Chainable stand-in for a postgrest query builder; records its filters."""
+
+    def __init__(self, table, action, args, options):
+        self.table = table
+        self.action = action
+        self.args = args
+        self.options = options
+        self.filters = []
+
+    @property
+    def not_(self):
+        return self
+
+    def __getattr__(self, name):
+        def add_filter(*args, **kwargs):
+            self.filters.append((name, args))
+            return self
+        return add_filter
+
+    def execute(self):
+        self.table.executed.append(self)
+        return self.table.respond(self)
+
+
+class FakeUrlTable:
+    """product_page_urls stand-in: a fixed pending SELECT, and an UPDATE that only wins some rows."""
+
+    def __init__(self, pending, claimable_ids):
+        self.pending = pending
+        self.claimable_ids = claimable_ids
+        self.executed = []
+
+    def select(self, *args, **options):
+        return FakeQuery(self, 'select', args, options)
+
+    def update(self, *args, **options):
+        return FakeQuery(self, 'update', args, options)
+
+    def respond(self, query):
+        if query.action == 'update':
+            return mock.Mock(data=[row for row in self.pending if row['id'] in self.claimable_ids])
+        if query.options.get('head'):
+            return mock.Mock(data=[], count=len(self.pending))
+        return mock.Mock(data=list(self.pending))
+
+
+class ClaimPendingUrlsTest(unittest.TestCase):
+    """fetch_pending_urls only processes the rows its conditional UPDATE actually claimed."""
+
+    PENDING = [
+        {'id': i, 'product_type_id': 1, 'product_page_url': f'https://shop.example/{i}', 'retry_count': 0}
+        for i in range(1, 6)
+    ]
+
+    def use_table(self, table):
+        patcher = mock.patch.object(product_worker, 'url_table', table)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_partial_claim_returns_only_claimed_rows(self):
+        table = FakeUrlTable(self.PENDING, claimable_ids={2, 4})
+        self.use_table(table)
+
+        urls = product_worker.fetch_pending_urls(batch_size=5)
+
+        self.assertEqual([url['id'] for url in urls], [2, 4])
+        updates = [query for query in table.executed if query.action == 'update']
+        self.assertEqual(len(updates), 1)
+        # The claim must only flip rows that are still pending
+        self.assertIn(('eq', ('processing_status', 'pending')), updates[0].filters)
+        self.assertEqual(updates[0].args[0]['processing_status'], 'processing')
+
+    def test_fully_stolen_batch_is_retried_then_given_up(self):
+        table = FakeUrlTable(self.PENDING, claimable_ids=set())
+        self.use_table(table)
+
+        urls = product_worker.fetch_pending_urls(batch_size=5)
+
+        self.assertEqual(urls, [])
+        updates = [query for query in table.executed if query.action == 'update']
+        self.assertEqual(len(updates), product_worker.CLAIM_ATTEMPTS)
+
+
+def fetched_chunk(records):
+    """A fetch_batch_html chunk whose pages all came back successfully."""
+    return {
+        'url_records': records,
+        'url_to_records': {record['product_page_url']: [record] for record in records},
+        'html_results': [
+            {'url': record['product_page_url'], 'status': 'success', 'html': '<html></html>'} for record in records
+        ],
+        'min_id': records[0]['id'],
+        'max_id': records[-1]['id'],
+    }
+
+
+class FetcherShutdownTest(unittest.TestCase):
+    """Rows the fetcher claimed but never handed to extraction go back to 'pending' on shutdown."""
+
+    RECORDS = [
+        {'id': i, 'product_type_id': 1, 'product_page_url': f'https://shop.example/{i}', 'retry_count': 0}
+        for i in range(1, 5)
+    ]
+
+    def test_unextracted_claims_are_released(self):
+        batches = [list(self.RECORDS)]
+        table = FakeUrlTable([], claimable_ids=set())
+        stop = threading.Event()
+        fetched_batches = queue.Queue(maxsize=1)
+
+        def fetch_batch_html(url_records):
+            yield fetched_chunk(url_records[:2])
+            yield fetched_chunk(url_records[2:])
+
+        with mock.patch.object(product_worker, 'url_table', table), \
+                mock.patch.object(product_worker, 'fetch_pending_urls', side_effect=lambda n: batches.pop() if batches else []), \
+                mock.patch.object(product_worker, 'fetch_batch_html', side_effect=fetch_batch_html), \
+                mock.patch.object(product_worker, 'POLL_INTERVAL', 0.01):
+            fetcher = threading.Thread(target=product_worker._fetch_loop, args=(fetched_batches, stop), daemon=True)
+            fetcher.start()
+
+            chunks = product_worker._batch_chunks(fetched_batches)
+            first = next(chunks)  # Handed to extraction: no longer the fetcher's to release
+            self.assertEqual(first['min_id'], 1)
+
+            # Shut down before the second chunk is taken
+            stop.set()
+            product_worker._release_unextracted_claims()
+
+            # Let the blocked fetcher finish its batch so the thread exits
+            self.assertEqual([chunk['min_id'] for chunk in chunks], [3])
+            fetcher.join(timeout=5)
+
+        self.assertFalse(fetcher.is_alive())
+        updates = [query for query in table.executed if query.action == 'update']
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(updates[0].args[0]['processing_status'], 'pending')
+        released = [args for name, args in updates[0].filters if name == 'in_']
+        self.assertEqual(sorted(released[0][1]), [3, 4])
+        self.assertIn(('eq', ('claimed_by', product_worker.WORKER_ID)), updates[0].filters)
+        self.assertEqual(product_worker._unextracted_claims, set())
+
+
+def failed_chunk(records):
+    """A fetch_batch_html chunk whose pages all failed to fetch."""
+    fetched = fetched_chunk(records)
+    fetched['html_results'] = [
+        {'url': record['product_page_url'], 'status': 'failed', 'html': '', 'error': 'HTTP 503'} for record in records
+    ]
+    return fetched
+
+
+def fake_process_single_url(item):
+    url, html_result, records = item
+    return [
+        {'url_id': record['id'], 'url': url, 'success': True, 'products_found': 1, 'products_saved': 1, 'error': None}
+        for record in records
+    ]
+
+
+class ExtractBatchTest(unittest.TestCase):
+    """A batch's chunks are extracted together, and a failing batch doesn't leak into the next."""
+
+    RECORDS = [
+        {'id': i, 'product_type_id': 1, 'product_page_url': f'https://shop.example/{i}', 'retry_count': 0}
+        for i in range(1, 7)
+    ]
+
+    def setUp(self):
+        for name, patch in (
+            ('process_single_url', mock.patch.object(product_worker, 'process_single_url', side_effect=fake_process_single_url)),
+            ('update_url_status', mock.patch.object(product_worker, 'update_url_status')),
+            ('release_claims', mock.patch.object(product_worker, '_release_claims')),
+        ):
+            setattr(self, name, patch.start())
+            self.addCleanup(patch.stop)
+
+    def extracted_ids(self):
+        return sorted(record['id'] for call in self.process_single_url.call_args_list for record in call.args[0][2])
+
+    def test_chunks_share_one_summary(self):
+        def fetch_batch_html(url_records):
+            # Like the real chunks, each one carries the whole batch's records and ID range
+            for chunk in (fetched_chunk(url_records[:2]), fetched_chunk(url_records[2:])):
+                chunk.update(url_records=url_records, min_id=url_records[0]['id'], max_id=url_records[-1]['id'])
+                yield chunk
+
+        with mock.patch.object(product_worker, 'fetch_batch_html', side_effect=fetch_batch_html), \
+                self.assertLogs(product_worker.logger, logging.INFO) as logs:
+            product_worker.process_batch(self.RECORDS)
+
+        self.assertEqual(self.extracted_ids(), [1, 2, 3, 4, 5, 6])
+        self.update_url_status.assert_not_called()
+        messages = [record.getMessage() for record in logs.records]
+        self.assertEqual(messages.count('BATCH PROCESSING COMPLETE'), 1)
+        self.assertIn('  Total URLs in batch: 6', messages)
+        self.assertIn('  HTML results received: 6', messages)
+        self.assertIn('  ID Range processed: 1 to 6', messages)
+
+    def test_failed_chunk_is_marked_failed_without_extraction(self):
+        def fetch_batch_html(url_records):
+            yield failed_chunk(url_records[:2])
+            yield fetched_chunk(url_records[2:])
+
+        with mock.patch.object(product_worker, 'fetch_batch_html', side_effect=fetch_batch_html):
+            product_worker.process_batch(self.RECORDS)
+
+        self.assertEqual(self.extracted_ids(), [3, 4, 5, 6])
+        updates = sorted((call.kwargs['url_id'], call.kwargs['success'], call.kwargs['error_message'])
+                         for call in self.update_url_status.call_args_list)
+        self.assertEqual(updates, [(1, False, 'HTTP 503'), (2, False, 'HTTP 503')])
+
+    def test_failure_part_way_does_not_leak_into_next_batch(self):
+        fetched_batches = queue.Queue()
+        for item in (failed_chunk(self.RECORDS[:2]), fetched_chunk(self.RECORDS[2:4]), None,
+                     fetched_chunk(self.RECORDS[4:]), None):
+            fetched_batches.put(item)
+        self.update_url_status.side_effect = RuntimeError('database unavailable')
+
+        with self.assertRaises(RuntimeError):
+            product_worker._extract_fetched_batch(fetched_batches)
+
+        # The first batch's unreached chunk was taken off the queue and its rows released
+        self.release_claims.assert_called_once_with([3, 4])
+        self.assertEqual(self.extracted_ids(), [])
+
+        self.update_url_status.side_effect = None
+        product_worker._extract_fetched_batch(fetched_batches)
+
+        self.assertEqual(self.extracted_ids(), [5, 6])
+        self.assertTrue(fetched_batches.empty())
+
+
+class ExcludedUrlKeywordsTest(unittest.TestCase):
+    """EXCLUDED_URL_KEYWORDS are matched literally, not as LIKE wildcards."""
+
+    def test_wildcards_in_keywords_are_escaped(self):
+        table = FakeUrlTable([], claimable_ids=set())
+        with mock.patch.object(product_worker, 'url_table', table), \
+                mock.patch.object(product_worker, 'EXCLUDED_URL_KEYWORDS', ['meesho', 'a_b', '50%', 'x\\y']):
+            query = product_worker._select_pending_urls('id')
+
+        patterns = [args[1] for name, args in query.filters if name == 'ilike']
+        self.assertEqual(patterns, ['%meesho%', '%a\\_b%', '%50\\%%', '%x\\\\y%'])
+
+
+if __name__ == '__main__':
+    unittest.main()